@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Measure the import time of every module in the collection.
+
+Each module is imported in a fresh interpreter, the way AnsiballZ starts it on the target, and the
+median of several runs is reported.  With --baseline the same measurement is taken for another git
+revision of the collection so the cost of a change to module_utils can be compared.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --baseline HEAD~1 --runs 7 --json import_time.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'ansible_collections.wwt.ansible_dnac.plugins.modules.'
+
+PROBE = """
+import importlib, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(time.perf_counter() - start)
+"""
+
+
+def collection_root(source, workdir):
+    """
+    Build an ansible_collections tree pointing at the collection source.
+
+    :return: directory to put on PYTHONPATH
+    """
+    root = os.path.join(workdir, 'collections')
+    namespace = os.path.join(root, 'ansible_collections', 'wwt')
+    os.makedirs(namespace)
+    os.symlink(source, os.path.join(namespace, 'ansible_dnac'))
+    return root
+
+
+def export_revision(revision, workdir):
+    """
+    Extract a git revision of the collection into workdir.
+    """
+    target = os.path.join(workdir, 'source')
+    os.makedirs(target)
+    archive = subprocess.Popen(['git', '-C', ROOT, 'archive', revision], stdout=subprocess.PIPE)
+    subprocess.check_call(['tar', '-x', '-C', target], stdin=archive.stdout)
+    if archive.wait() != 0:
+        raise SystemExit('git archive {0} failed'.format(revision))
+    return target
+
+
+def import_time(module, pythonpath, runs):
+    """
+    :return: median import time in milliseconds or None if the import failed
+    """
+    env = dict(os.environ, PYTHONPATH=pythonpath)
+    samples = []
+    for _ in range(runs):
+        probe = subprocess.run([sys.executable, '-c', PROBE.format(module=PACKAGE + module)],
+                               env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if probe.returncode != 0:
+            return None
+        samples.append(float(probe.stdout) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def measure(source, runs):
+    workdir = tempfile.mkdtemp(prefix='dnac_import_')
+    try:
+        pythonpath = collection_root(source, workdir)
+        modules = sorted(os.path.basename(path)[:-3]
+                         for path in glob.glob(os.path.join(source, 'plugins', 'modules', 'dnac_*.py')))
+        return dict((module, import_time(module, pythonpath, runs)) for module in modules)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='imports per module, the median is reported')
+    parser.add_argument('--baseline', help='git revision to compare against')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = {'current': measure(ROOT, args.runs)}
+    if args.baseline:
+        workdir = tempfile.mkdtemp(prefix='dnac_baseline_')
+        try:
+            results['baseline'] = measure(export_revision(args.baseline, workdir), args.runs)
+        finally:
+            shutil.rmtree(workdir)
+
+    def fmt(value):
+        return '{0:10.1f}'.format(value) if value is not None else '{0:>10}'.format('error')
+
+    header = '{0:32}{1:>10}'.format('module', 'ms')
+    if args.baseline:
+        header = '{0:32}{1:>10}{2:>10}'.format('module', args.baseline[:10], 'current')
+    print(header)
+    for module, current in sorted(results['current'].items()):
+        line = '{0:32}'.format(module)
+        if args.baseline:
+            line += fmt(results['baseline'].get(module))
+        print(line + fmt(current))
+
+    if args.json:
+        with open(args.json, 'w') as report:
+            json.dump(results, report, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,550 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Local stand-in for a DNA Center controller.
+
+Serves the endpoints used by the collection over HTTPS with a throwaway self-signed certificate:
+auth token, api/v1/group, intent site, commonsetting, api/v1/task, dnacaap execution status,
+network-device, topology, global-credential, ippool and enterprise-ssid.  The controller holds a
+synthetic site hierarchy and inventory; latency, page size limit, object counts and task duration
+are configurable.  Changes are applied when their task completes, as on a real controller.
+
+Point the modules or the inventory plugin at host 127.0.0.1:8443 with any username and password.  The
+clients skip certificate validation, unless REQUESTS_CA_BUNDLE or CURL_CA_BUNDLE is set: requests then
+validates against that bundle whatever the session says, so unset both when running against the mock.
+
+    python benchmarks/mock_dnac.py --port 8443 --devices 5000 --sites 3000 --latency 0.02 --task-duration 1
+
+GET /_mock/stats returns the number of requests and bytes served per endpoint, POST /_mock/reset
+clears them.  Import MockDnac and serve() to run the controller inside a benchmark.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import base64
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, unquote, urlsplit
+except ImportError:
+    raise SystemExit('the mock controller requires python 3.7 or later')
+
+TOKEN_LIFETIME = 3600
+
+
+class MockDnac(object):
+    """
+    In-memory controller state and request dispatcher, independent of the transport.
+
+    :param devices: Number of network devices, every fifth one is an access point.
+    :param sites: Number of areas, buildings and floors below Global.
+    :param latency: Seconds added to every request.
+    :param page_limit: Largest page of network devices returned whatever limit is asked for.
+    :param task_duration: Seconds until a task or intent execution completes.
+    :param seed: Seed of the synthetic data.
+    """
+
+    def __init__(self, devices=100, sites=30, latency=0.0, page_limit=500, task_duration=0.0, seed=0):
+        self.latency = latency
+        self.page_limit = page_limit
+        self.task_duration = task_duration
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.calls = Counter()
+        self.bytes = Counter()
+        self.tokens = set()
+        self.tasks = {}
+
+        rng = random.Random(seed)
+        self.groups = {}
+        self.add_group('global', 'Global', None, 'global')
+        self.build_sites(sites)
+        self.devices = []
+        self.device_sites = {}
+        self.build_devices(devices, rng)
+
+        self.settings = {}
+        self.credentials = [
+            {'id': 'cred-cli-1', 'credentialType': 'GLOBAL', 'credentialSubType': 'CLI', 'username': 'admin',
+             'description': 'admin', 'comments': ''},
+            {'id': 'cred-snmp-1', 'credentialType': 'GLOBAL', 'credentialSubType': 'SNMPV2_WRITE_COMMUNITY',
+             'description': 'private', 'comments': ''},
+            {'id': 'cred-snmp-2', 'credentialType': 'GLOBAL', 'credentialSubType': 'SNMPV2_READ_COMMUNITY',
+             'description': 'public', 'comments': ''},
+        ]
+        self.ippools = [{'id': 'pool-1', 'ipPoolName': 'Infrastructure', 'ipPoolCidr': '10.0.0.0/8',
+                         'gateways': ['10.0.0.1'], 'dhcpServerIps': [], 'dnsServerIps': [], 'overlapping': False}]
+        self.ssids = []
+
+        self.routes = [
+            ('POST', 'api/system/v1/auth/token', self.auth_token),
+            ('POST', 'dna/system/api/v1/auth/token', self.auth_token),
+            ('GET', 'api/v1/group', self.get_groups),
+            ('GET', 'api/v1/group/{id}', self.get_group),
+            ('POST', 'dna/intent/api/v1/site', self.create_site),
+            ('DELETE', 'dna/intent/api/v1/site/{id}', self.delete_site),
+            ('GET', 'api/v1/commonsetting/global/{id}', self.get_settings),
+            ('POST', 'api/v1/commonsetting/global/{id}', self.set_settings),
+            ('GET', 'api/v1/task/{id}', self.get_task),
+            ('GET', 'api/dnacaap/v1/dnacaap/management/execution-status/{id}', self.get_execution),
+            ('GET', 'api/v1/network-device', self.get_devices),
+            ('GET', 'dna/intent/api/v1/network-device', self.get_devices),
+            ('GET', 'dna/intent/api/v1/topology/site-topology', self.site_topology),
+            ('GET', 'dna/intent/api/v1/topology/physical-topology', self.physical_topology),
+            ('GET', 'api/v1/global-credential', self.get_credentials),
+            ('POST', 'api/v1/global-credential/{id}', self.create_credential),
+            ('PUT', 'api/v1/global-credential/{id}', self.update_credential),
+            ('DELETE', 'api/v1/global-credential/{id}', self.delete_credential),
+            ('GET', 'api/v2/ippool', self.get_ippools),
+            ('POST', 'api/v2/ippool', self.create_ippool),
+            ('DELETE', 'api/v2/ippool/{id}', self.delete_ippool),
+            ('GET', 'dna/intent/api/v1/enterprise-ssid', self.get_ssids),
+            ('POST', 'dna/intent/api/v1/enterprise-ssid', self.create_ssid),
+            ('DELETE', 'dna/intent/api/v1/enterprise-ssid/{id}', self.delete_ssid),
+        ]
+        self.routes = [(method, endpoint, re.compile(re.escape(endpoint).replace(r'\{id\}', '([^/]+)') + '$'), handler)
+                       for method, endpoint, handler in self.routes]
+
+    # synthetic data
+
+    def add_group(self, group_id, name, parent, site_type):
+        hierarchy = name if parent is None else parent['groupNameHierarchy'] + '/' + name
+        group = {'id': group_id, 'name': name, 'groupNameHierarchy': hierarchy,
+                 'parentId': parent['id'] if parent else None, 'groupTypeList': ['SITE'],
+                 'systemGroup': parent is None, 'locationType': site_type,
+                 'additionalInfo': [{'nameSpace': 'Location', 'attributes': {'type': site_type}}]}
+        self.groups[group_id] = group
+        return group
+
+    def build_sites(self, count):
+        """
+        One area per twenty sites, one building per five sites and floors for the rest.  Floor names
+        repeat across buildings as they do on real campuses.
+        """
+        if count <= 0:
+            return
+        areas = max(1, count // 20)
+        buildings = max(1, count // 5) if count > areas else 0
+        floors = max(0, count - areas - buildings)
+        self.areas = [self.add_group('area-{0}'.format(i), 'Area-{0:04d}'.format(i), self.groups['global'], 'area')
+                      for i in range(areas)]
+        self.buildings = [self.add_group('building-{0}'.format(i), 'Building-{0:04d}'.format(i),
+                                         self.areas[i % areas], 'building') for i in range(buildings)]
+        self.floors = [self.add_group('floor-{0}'.format(i), 'Floor-{0}'.format(i // buildings + 1),
+                                      self.buildings[i % buildings], 'floor') for i in range(floors)]
+
+    def build_devices(self, count, rng):
+        sites = getattr(self, 'floors', None) or getattr(self, 'buildings', None) or []
+        for i in range(count):
+            access_point = i % 5 == 4
+            device = {
+                'id': 'device-{0:06d}'.format(i),
+                'hostname': '{0}-{1:06d}'.format('ap' if access_point else 'sw', i),
+                'managementIpAddress': '10.{0}.{1}.{2}'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+                'type': 'Cisco 9120AXI Unified Access Point' if access_point else 'Cisco Catalyst 9300 Switch',
+                'family': 'Unified AP' if access_point else 'Switches and Hubs',
+                'series': 'Cisco Catalyst 9100 Series' if access_point else 'Cisco Catalyst 9300 Series Switches',
+                'platformId': 'C9120AXI-B' if access_point else 'C9300-48U',
+                'softwareType': 'IOS-XE',
+                'softwareVersion': rng.choice(['16.12.1', '16.12.3', '17.3.1']),
+                'role': 'ACCESS',
+                'serialNumber': 'FOC{0:08d}'.format(i),
+                'macAddress': '00:1e:{0:02x}:{1:02x}:{2:02x}:01'.format(i // 65536 % 256, i // 256 % 256, i % 256),
+                'upTime': '{0} days, 2:13:07.00'.format(rng.randint(1, 400)),
+                'reachabilityStatus': 'Reachable',
+                'collectionStatus': 'Managed',
+                'lastUpdated': '2019-10-01 12:00:00',
+                'lastUpdateTime': 1569931200000,
+                'location': None,
+                'instanceUuid': 'device-{0:06d}'.format(i),
+            }
+            self.devices.append(device)
+            if sites:
+                self.device_sites[device['id']] = sites[i % len(sites)]['id']
+
+    # transport independent dispatch
+
+    def handle(self, method, target, headers, body):
+        """
+        Serve one request and count it against its endpoint.
+
+        :param target: Path and query string of the request.
+        :param headers: Request headers, a mapping with case insensitive get.
+        :param body: Raw request body.
+
+        :return: tuple of status code and JSON encoded response.
+        """
+        url = urlsplit(target)
+        path = unquote(url.path).strip('/')
+        query = dict((key, values[0]) for key, values in parse_qs(url.query).items())
+
+        if path == '_mock/stats':
+            with self.lock:
+                stats = {'calls': dict(self.calls), 'bytes': dict(self.bytes),
+                         'total_calls': sum(self.calls.values()), 'total_bytes': sum(self.bytes.values())}
+            return 200, json.dumps(stats).encode('utf-8')
+        if path == '_mock/reset':
+            with self.lock:
+                self.calls.clear()
+                self.bytes.clear()
+            return 200, b'{}'
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        status, endpoint, document = self.route(method, path, query, headers, body)
+        payload = json.dumps(document).encode('utf-8')
+        with self.lock:
+            self.calls[method + ' ' + endpoint] += 1
+            self.bytes[method + ' ' + endpoint] += len(payload)
+        return status, payload
+
+    def route(self, method, path, query, headers, body):
+        """
+        :return: tuple of status code, endpoint template and response document.
+        """
+        for route_method, endpoint, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return 404, 'unknown', {'response': {'errorCode': 'NotFound', 'message': 'no route for ' + path}}
+
+        if handler != self.auth_token and headers.get('X-Auth-Token') not in self.tokens:
+            return 401, endpoint, {'response': {'errorCode': 'Unauthorized', 'message': 'invalid token'}}
+
+        try:
+            document = json.loads(body) if body else None
+        except ValueError:
+            return 400, endpoint, {'response': {'errorCode': 'BadRequest', 'message': 'invalid json'}}
+
+        with self.lock:
+            status, document = handler(query, document, *match.groups())
+        return status, endpoint, document
+
+    def new_id(self, prefix):
+        return '{0}-{1:08d}'.format(prefix, next(self.ids))
+
+    def submit(self, apply=None, error=None, execution=False, bapi='Create Site'):
+        """
+        Register an asynchronous change applied once its task completes.
+
+        :return: task document returned by the submitting call.
+        """
+        task_id = self.new_id('execution' if execution else 'task')
+        self.tasks[task_id] = {'start': time.time(), 'apply': apply, 'error': error, 'bapi': bapi}
+        if execution:
+            return 202, {'executionId': task_id, 'executionStatusUrl': '/dna/platform/management/business-api/'
+                         'v1/execution-status/' + task_id, 'message': 'The request has been accepted for execution'}
+        return 202, {'response': {'taskId': task_id, 'url': '/api/v1/task/' + task_id}, 'version': '1.0'}
+
+    def finish(self, task_id):
+        """
+        :return: the task if it completed, None while it is still running.
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+        end = task['start'] + self.task_duration
+        if time.time() < end:
+            return None
+        if task['apply'] is not None:
+            task['error'] = task['apply']() or task['error']
+            task['apply'] = None
+        task['end'] = int(end * 1000)
+        return task
+
+    # endpoints
+
+    def auth_token(self, query, document):
+        now = int(time.time())
+        claims = base64.urlsafe_b64encode(json.dumps({'exp': now + TOKEN_LIFETIME, 'sub': 'mock'}).encode())
+        token = 'eyJhbGciOiJub25lIn0.' + claims.decode().rstrip('=') + '.' + self.new_id('sig')
+        self.tokens.add(token)
+        return 200, {'Token': token}
+
+    def get_groups(self, query, document):
+        groups = self.groups.values()
+        if 'groupName' in query:
+            groups = [group for group in groups if group['name'] == query['groupName']]
+        if 'groupNameHierarchy' in query:
+            groups = [group for group in groups if group['groupNameHierarchy'] == query['groupNameHierarchy']]
+        return 200, {'response': list(groups), 'version': '1.0'}
+
+    def get_group(self, query, document, group_id):
+        if group_id not in self.groups:
+            return 404, {'response': {'errorCode': 'NotFound', 'message': 'group not found'}}
+        return 200, {'response': self.groups[group_id], 'version': '1.0'}
+
+    def create_site(self, query, document):
+        site_type = document['type']
+        site = document['site'][site_type]
+        parents = [group for group in self.groups.values() if group['groupNameHierarchy'] == site['parentName']]
+
+        def apply():
+            if not parents:
+                return 'parent {0} does not exist'.format(site['parentName'])
+            self.add_group(self.new_id(site_type), site['name'], parents[0], site_type)
+
+        return self.submit(apply, execution=True, bapi='Create Site')
+
+    def delete_site(self, query, document, site_id):
+        def apply():
+            if site_id not in self.groups:
+                return 'site {0} does not exist'.format(site_id)
+            if any(group['parentId'] == site_id for group in self.groups.values()):
+                return 'site {0} has child sites'.format(site_id)
+            del self.groups[site_id]
+
+        return self.submit(apply, execution=True, bapi='Delete Site')
+
+    def get_settings(self, query, document, group_id):
+        settings = self.settings.get(group_id, {})
+        if 'key' in query:
+            settings = dict((key, value) for key, value in settings.items() if key == query['key'])
+        return 200, {'response': list(settings.values()), 'version': '1.0'}
+
+    def set_settings(self, query, document, group_id):
+        def apply():
+            for setting in document:
+                setting = dict(setting, groupUuid=group_id, instanceUuid=self.new_id('setting'), version=1)
+                self.settings.setdefault(group_id, {})[setting['key']] = setting
+
+        return self.submit(apply)
+
+    def get_task(self, query, document, task_id):
+        task = self.finish(task_id)
+        if task_id not in self.tasks:
+            return 404, {'response': {'errorCode': 'NotFound', 'message': 'task not found'}}
+        status = {'id': task_id, 'startTime': int(self.tasks[task_id]['start'] * 1000), 'version': 1,
+                  'progress': 'in progress', 'isError': False}
+        if task is not None:
+            status.update({'endTime': task['end'], 'progress': task['error'] or 'completed',
+                           'isError': bool(task['error'])})
+            if task['error']:
+                status['failureReason'] = task['error']
+        return 200, {'response': status, 'version': '1.0'}
+
+    def get_execution(self, query, document, execution_id):
+        task = self.finish(execution_id)
+        if execution_id not in self.tasks:
+            return 404, {'response': {'errorCode': 'NotFound', 'message': 'execution not found'}}
+        status = {'executionId': execution_id, 'bapiName': self.tasks[execution_id]['bapi'],
+                  'startTime': int(self.tasks[execution_id]['start'] * 1000), 'status': 'IN_PROGRESS'}
+        if task is not None:
+            status.update({'endTime': task['end'], 'status': 'FAILURE' if task['error'] else 'SUCCESS'})
+            if task['error']:
+                status['bapiError'] = task['error']
+        return 200, status
+
+    def get_devices(self, query, document):
+        devices = self.devices
+        if 'hostname' in query:
+            devices = [device for device in devices if device['hostname'] == query['hostname']]
+        if 'managementIpAddress' in query:
+            devices = [device for device in devices if device['managementIpAddress'] == query['managementIpAddress']]
+        offset = max(int(query.get('offset', 1)), 1)
+        limit = min(int(query.get('limit', self.page_limit)), self.page_limit)
+        return 200, {'response': devices[offset - 1:offset - 1 + limit], 'version': '1.0'}
+
+    def site_topology(self, query, document):
+        sites = [{'id': group['id'], 'name': group['name'], 'parentId': group['parentId'] or '',
+                  'groupNameHierarchy': group['groupNameHierarchy'], 'locationType': group['locationType']}
+                 for group in self.groups.values() if group['parentId']]
+        return 200, {'response': {'sites': sites}, 'version': '1.0'}
+
+    def physical_topology(self, query, document):
+        nodes = [{'id': device['id'], 'label': device['hostname'], 'ip': device['managementIpAddress'],
+                  'deviceType': device['type'], 'nodeType': 'device',
+                  'additionalInfo': {'siteid': self.device_sites.get(device['id'])}}
+                 for device in self.devices]
+        return 200, {'response': {'nodes': nodes, 'links': []}, 'version': '1.0'}
+
+    def get_credentials(self, query, document):
+        credentials = [credential for credential in self.credentials
+                       if credential['credentialSubType'] == query.get('credentialSubType')]
+        return 200, {'response': credentials, 'version': '1.0'}
+
+    def create_credential(self, query, document, sub_type):
+        sub_types = {'cli': 'CLI', 'snmpv2-read-community': 'SNMPV2_READ_COMMUNITY',
+                     'snmpv2-write-community': 'SNMPV2_WRITE_COMMUNITY'}
+
+        def apply():
+            for credential in document:
+                credential = dict((key, value) for key, value in credential.items()
+                                  if key not in ['password', 'enablePassword', 'readCommunity', 'writeCommunity'])
+                credential.update({'id': self.new_id('cred'), 'credentialType': 'GLOBAL',
+                                   'credentialSubType': sub_types.get(sub_type, sub_type.upper())})
+                self.credentials.append(credential)
+
+        return self.submit(apply)
+
+    def update_credential(self, query, document, sub_type):
+        def apply():
+            for credential in self.credentials:
+                if document and credential['id'] == document.get('id'):
+                    credential.update((key, value) for key, value in document.items()
+                                      if key not in ['password', 'enablePassword'])
+                    return None
+            return 'credential not found'
+
+        return self.submit(apply)
+
+    def delete_credential(self, query, document, credential_id):
+        def apply():
+            self.credentials = [credential for credential in self.credentials if credential['id'] != credential_id]
+
+        return self.submit(apply)
+
+    def get_ippools(self, query, document):
+        return 200, {'response': self.ippools, 'version': '1.0'}
+
+    def create_ippool(self, query, document):
+        def apply():
+            self.ippools.append(dict(document, id=self.new_id('pool')))
+
+        return self.submit(apply)
+
+    def delete_ippool(self, query, document, pool_id):
+        def apply():
+            self.ippools = [pool for pool in self.ippools if pool['id'] != pool_id]
+
+        return self.submit(apply)
+
+    def get_ssids(self, query, document):
+        return 200, self.ssids
+
+    def create_ssid(self, query, document):
+        def apply():
+            self.ssids.append({'instanceUuid': self.new_id('ssid'), 'version': 1,
+                               'ssidDetails': [dict((key, value) for key, value in document.items()
+                                                    if key != 'passphrase')]})
+
+        return self.submit(apply, execution=True, bapi='Create Enterprise SSID')
+
+    def delete_ssid(self, query, document, name):
+        def apply():
+            self.ssids = [ssid for ssid in self.ssids if ssid['ssidDetails'][0]['name'] != name]
+
+        return self.submit(apply, execution=True, bapi='Delete Enterprise SSID')
+
+
+class MockHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def dispatch(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, payload = self.server.app.handle(self.command, self.path, self.headers, body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, app, address):
+        ThreadingHTTPServer.__init__(self, address, MockHandler)
+        self.app = app
+
+    @property
+    def host(self):
+        """
+        host argument for the modules and the inventory plugin.
+        """
+        return '{0}:{1}'.format(*self.server_address[:2])
+
+
+def make_certificate(directory):
+    """
+    Create a self-signed certificate for localhost with the openssl command.
+
+    :return: tuple of certificate and key file paths.
+    """
+    certfile = os.path.join(directory, 'mock_dnac.crt')
+    keyfile = os.path.join(directory, 'mock_dnac.key')
+    subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                           '-subj', '/CN=localhost', '-keyout', keyfile, '-out', certfile],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return certfile, keyfile
+
+
+def serve(app, host='127.0.0.1', port=0, certfile=None, keyfile=None):
+    """
+    Serve the controller over HTTPS from a background thread.
+
+    :param port: TCP port, 0 picks a free one.
+    :return: the running MockServer, stop it with shutdown().
+    """
+    server = MockServer(app, (host, port))
+    workdir = None
+    if certfile is None:
+        workdir = tempfile.mkdtemp(prefix='mock_dnac_')
+        certfile, keyfile = make_certificate(workdir)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    if workdir is not None:
+        shutil.rmtree(workdir)
+
+    thread = threading.Thread(target=server.serve_forever, name='mock-dnac')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--devices', type=int, default=100, help='number of network devices')
+    parser.add_argument('--sites', type=int, default=30, help='number of areas, buildings and floors')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--page-limit', type=int, default=500, help='largest page of network devices')
+    parser.add_argument('--task-duration', type=float, default=0.0, help='seconds until a task completes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--certfile', help='certificate to serve instead of a generated one')
+    parser.add_argument('--keyfile')
+    args = parser.parse_args()
+
+    app = MockDnac(devices=args.devices, sites=args.sites, latency=args.latency, page_limit=args.page_limit,
+                   task_duration=args.task_duration, seed=args.seed)
+    server = serve(app, args.host, args.port, args.certfile, args.keyfile)
+    print('mock DNA Center with {0} devices and {1} sites listening on https://{2}'.format(
+        len(app.devices), len(app.groups) - 1, server.host))
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
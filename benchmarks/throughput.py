@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Throughput of the inventory plugin and the modules against a mock controller of growing size.
+
+For every inventory size a mock_dnac.py controller is started with that many devices and one site per
+ten devices, then each scenario runs in a fresh interpreter:
+
+    inventory         InventoryModule.parse of the whole controller
+    common_settings   the NTP, DNS, DHCP, Syslog, SNMP, Netflow, banner and timezone modules applied to
+                      Global and five buildings, one module run per task as a role would do
+    network_settings  the same settings applied with one dnac_network_settings run
+    site_hierarchy    dnac_site run for each site of a new area with 4 buildings of 3 floors
+    sites             the same hierarchy built with one dnac_sites run
+    task_polling      50 common setting tasks awaited with dnac_task_wait
+
+Modules run the way Ansible runs them on the controller, a python process per task reading its
+arguments from a file.  Wall time, HTTP calls and bytes served by the mock and the peak RSS of the
+scenario process and of its largest module process are reported, and written as JSON with --json.
+A scenario running longer than --timeout is stopped and reported as timed out.
+
+    python benchmarks/throughput.py
+    python benchmarks/throughput.py --sizes 100 1000 10000 50000 --latency 0.02 --json throughput.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'ansible_collections.wwt.ansible_dnac.plugins.modules.'
+SCENARIOS = ['inventory', 'common_settings', 'network_settings', 'site_hierarchy', 'sites', 'task_polling']
+# requests validates against these bundles even with verify disabled, which fails on the self-signed mock
+CA_BUNDLE_VARIABLES = ['REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE']
+
+SETTINGS = {
+    'ntp': {'ntp_servers': ['192.168.200.1', '192.168.200.2']},
+    'dns': {'domain_name': 'wwtatc.local', 'primary_dns_server': '192.168.200.10',
+            'secondary_dns_server': '192.168.200.11'},
+    'dhcp': {'dhcp_servers': ['192.168.201.1']},
+    'syslog': {'syslog_servers': ['192.168.200.3']},
+    'snmp': {'snmp_servers': ['192.168.200.4']},
+    'netflow': {'netflow_collector': '192.168.201.5', 'netflow_port': '2055'},
+    'banner': {'banner_message': 'Authorized access only'},
+    'timezone': {'timezone': 'America/Chicago'},
+}
+
+
+def collection_root(workdir):
+    """
+    Build an ansible_collections tree pointing at the collection source.
+
+    :return: directory to put on PYTHONPATH
+    """
+    root = os.path.join(workdir, 'collections')
+    namespace = os.path.join(root, 'ansible_collections', 'wwt')
+    os.makedirs(namespace)
+    os.symlink(ROOT, os.path.join(namespace, 'ansible_dnac'))
+    return root
+
+
+def peak_rss(who):
+    """
+    :return: peak resident set size in MB of this process or of its largest child.
+    """
+    peak = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024.0 * 1024 if sys.platform == 'darwin' else 1024.0), 1)
+
+
+class Scenario(object):
+    """
+    Runs one scenario against the controller at host from inside the scenario process.
+    """
+
+    def __init__(self, host, size, workdir):
+        self.host = host
+        self.size = size
+        self.workdir = workdir
+        self.runs = 0
+
+    def run_module(self, module, params):
+        """
+        Run a module in its own interpreter and return its result.
+        """
+        self.runs += 1
+        args = dict(params, host=self.host, username='admin', password='admin', timeout=300)
+        path = os.path.join(self.workdir, 'args-{0}.json'.format(self.runs))
+        with open(path, 'w') as args_file:
+            json.dump({'ANSIBLE_MODULE_ARGS': args}, args_file)
+        process = subprocess.run([sys.executable, '-m', PACKAGE + module, path],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            result = json.loads(process.stdout)
+        except ValueError:
+            raise SystemExit('{0} did not return JSON: {1}'.format(module, process.stderr.decode()[-2000:]))
+        if result.get('failed'):
+            raise SystemExit('{0} failed: {1}'.format(module, result.get('msg')))
+        return result
+
+    def inventory(self):
+        from ansible.inventory.data import InventoryData
+        from ansible.parsing.dataloader import DataLoader
+        from ansible.plugins.loader import init_plugin_loader, inventory_loader
+
+        init_plugin_loader([os.environ['PYTHONPATH']])
+        path = os.path.join(self.workdir, 'dna_center.yml')
+        with open(path, 'w') as config:
+            json.dump({'plugin': 'wwt.ansible_dnac.dna_center', 'host': self.host, 'username': 'admin',
+                       'password': 'admin', 'page_workers': 4}, config)
+        inventory = InventoryData()
+        inventory_loader.get('wwt.ansible_dnac.dna_center').parse(inventory, DataLoader(), path, cache=False)
+        return {'hosts': len(inventory.hosts), 'groups': len(inventory.groups)}
+
+    def buildings(self, count):
+        return ['Global/Area-0000/Building-{0:04d}'.format(i) for i in range(count)]
+
+    def common_settings(self):
+        for group in ['-1'] + self.buildings(5):
+            for name, params in sorted(SETTINGS.items()):
+                self.run_module('dnac_' + name, dict(params, group_name=group))
+        return {'module_runs': self.runs}
+
+    def network_settings(self):
+        values = {'ntp': ['192.168.202.1'],
+                  'dns': {'domain_name': 'wwtatc.local', 'primary_dns_server': '192.168.202.10'},
+                  'dhcp': ['192.168.202.2'], 'syslog': ['192.168.202.3'], 'snmp': ['192.168.202.4'],
+                  'netflow': {'collector': '192.168.202.5', 'port': 2055}, 'banner': 'Authorized access only',
+                  'timezone': 'America/Chicago'}
+        settings = dict((group, values) for group in ['Global'] + self.buildings(5))
+        result = self.run_module('dnac_network_settings', {'settings': settings})
+        return {'module_runs': self.runs, 'sites_changed': len(result['changes'])}
+
+    def hierarchy(self, prefix):
+        area = '{0}-{1}'.format(prefix, self.size)
+        sites = [{'name': area, 'site_type': 'area', 'parent_name': 'Global'}]
+        for building in range(4):
+            name = '{0}-Building-{1}'.format(area, building)
+            sites.append({'name': name, 'site_type': 'building', 'parent_name': 'Global/' + area,
+                          'address': '1 World Wide Way, St Louis, Mo', 'latitude': '38.540450',
+                          'longitude': '-90.443660'})
+            for floor in range(3):
+                sites.append({'name': 'Floor-{0}'.format(floor + 1), 'site_type': 'floor',
+                              'parent_name': 'Global/{0}/{1}'.format(area, name), 'rf_model': 'Drywall Office Only',
+                              'width': '100', 'length': '100', 'height': '10'})
+        return sites
+
+    def site_hierarchy(self):
+        sites = self.hierarchy('Bench-Site')
+        for site in sites:
+            self.run_module('dnac_site', site)
+        return {'module_runs': self.runs, 'sites': len(sites)}
+
+    def sites(self):
+        sites = self.hierarchy('Bench-Sites')
+        self.run_module('dnac_sites', {'sites': sites, 'workers': 10})
+        return {'module_runs': self.runs, 'sites': len(sites)}
+
+    def task_polling(self):
+        import requests
+
+        session = requests.Session()
+        base = 'https://{0}/'.format(self.host)
+        token = session.post(base + 'dna/system/api/v1/auth/token', auth=('admin', 'admin'), verify=False)
+        session.headers['X-Auth-Token'] = token.json()['Token']
+        group_id = session.get(base + 'api/v1/group', params={'groupNameHierarchy': 'Global'},
+                               verify=False).json()['response'][0]['id']
+        task_ids = []
+        for server in range(50):
+            response = session.post(base + 'api/v1/commonsetting/global/' + group_id, verify=False,
+                                    json=[{'key': 'ntp.server', 'value': ['192.168.203.{0}'.format(server)]}])
+            task_ids.append(response.json()['response']['taskId'])
+        self.run_module('dnac_task_wait', {'task_ids': task_ids, 'workers': 10})
+        return {'module_runs': self.runs, 'tasks': len(task_ids)}
+
+
+def run_scenario(name, host, size):
+    """
+    Entry point of the scenario process, prints the measurements as JSON.
+    """
+    workdir = tempfile.mkdtemp(prefix='dnac_throughput_')
+    try:
+        scenario = Scenario(host, size, workdir)
+        start = time.perf_counter()
+        details = getattr(scenario, name)()
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(workdir)
+    print(json.dumps({'wall_s': round(wall, 3), 'peak_rss_mb': peak_rss(resource.RUSAGE_SELF),
+                      'peak_module_rss_mb': peak_rss(resource.RUSAGE_CHILDREN), 'details': details}))
+
+
+class MockController(object):
+    """
+    mock_dnac.py controller running in its own process.
+    """
+
+    def __init__(self, env, **options):
+        command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_dnac.py'), '--port', '0']
+        for option, value in options.items():
+            command.extend(['--' + option.replace('_', '-'), str(value)])
+        self.process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, universal_newlines=True)
+        banner = self.process.stdout.readline()
+        if not banner:
+            raise SystemExit('mock controller failed to start')
+        self.host = banner.rsplit('https://', 1)[1].strip()
+
+    def request(self, method, path):
+        import requests
+
+        return requests.request(method, 'https://{0}/{1}'.format(self.host, path), verify=False).json()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def run_size(controller, size, args, env):
+    """
+    Run every scenario in its own process against the controller.
+
+    :return: list of scenario results.
+    """
+    results = []
+    for name in args.scenarios:
+        controller.request('POST', '_mock/reset')
+        command = [sys.executable, os.path.abspath(__file__), '--run', name, '--host', controller.host,
+                   '--size', str(size)]
+        try:
+            scenario = subprocess.run(command, env=env, stdout=subprocess.PIPE, universal_newlines=True,
+                                      timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            result = {'wall_s': args.timeout, 'timed_out': True}
+        else:
+            if scenario.returncode != 0:
+                raise SystemExit('scenario {0} failed at {1} devices'.format(name, size))
+            result = json.loads(scenario.stdout.splitlines()[-1])
+        stats = controller.request('GET', '_mock/stats')
+        result.update(scenario=name, devices=size, http_calls=stats['total_calls'],
+                      http_bytes=stats['total_bytes'], endpoints=stats['calls'])
+        results.append(result)
+        if result.get('timed_out'):
+            print('{0:18}{1:>8}  timed out after {2} seconds'.format(name, size, args.timeout))
+        else:
+            print('{0:18}{1:>8}{2:>10.2f}{3:>8}{4:>12}{5:>10.1f}{6:>10.1f}'.format(
+                name, size, result['wall_s'], result['http_calls'], result['http_bytes'],
+                result['peak_rss_mb'], result['peak_module_rss_mb']))
+        sys.stdout.flush()
+    return results
+
+
+def revision():
+    try:
+        return subprocess.check_output(['git', '-C', ROOT, 'describe', '--always', '--dirty'],
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000],
+                        help='number of devices of the mock controller')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--task-duration', type=float, default=1.0, help='seconds until a task completes')
+    parser.add_argument('--timeout', type=int, default=1800, help='seconds before a scenario is abandoned')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--run', choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument('--host', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run_scenario(args.run, args.host, args.size)
+
+    import urllib3
+    urllib3.disable_warnings()
+
+    workdir = tempfile.mkdtemp(prefix='dnac_throughput_')
+    env = dict((name, value) for name, value in os.environ.items() if name not in CA_BUNDLE_VARIABLES)
+    env.update(PYTHONPATH=collection_root(workdir), PYTHONWARNINGS='ignore')
+    results = []
+    print('{0:18}{1:>8}{2:>10}{3:>8}{4:>12}{5:>10}{6:>10}'.format(
+        'scenario', 'devices', 'wall s', 'calls', 'bytes', 'rss MB', 'module MB'))
+    try:
+        for size in args.sizes:
+            controller = MockController(env, devices=size, sites=max(30, size // 10), latency=args.latency,
+                                        task_duration=args.task_duration)
+            try:
+                results.extend(run_size(controller, size, args, env))
+            finally:
+                controller.stop()
+    finally:
+        shutil.rmtree(workdir)
+
+    if args.json:
+        report = {'revision': revision(), 'python': platform.python_version(), 'latency': args.latency,
+                  'task_duration': args.task_duration, 'results': results}
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
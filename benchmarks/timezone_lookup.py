@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Micro-benchmark of timezone resolution for the buildings of a few campuses.
+
+Compares a new TimezoneFinder per lookup (the former DnaCenter.timezone_lookup behaviour) with the
+shared instance, optionally in memory, and the cached timezone_at used by the collection now.
+
+    python benchmarks/timezone_lookup.py --lookups 1000
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def collection_root():
+    """
+    Build an ansible_collections tree pointing at the collection source, geocode imports its siblings through it.
+
+    :return: directory to put on sys.path
+    """
+    root = tempfile.mkdtemp(prefix='dnac-timezone-')
+    namespace = os.path.join(root, 'ansible_collections', 'wwt')
+    os.makedirs(namespace)
+    os.symlink(ROOT, os.path.join(namespace, 'ansible_dnac'))
+    return root
+
+
+sys.path.insert(0, collection_root())
+
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac import geocode  # noqa: E402
+from timezonefinder import TimezoneFinder  # noqa: E402
+
+# St Louis, Barcelona and Sydney; buildings are scattered within a few hundred meters
+CAMPUSES = [(38.6489, -90.4413), (41.3543, 2.1278), (-33.8688, 151.2093)]
+
+
+def coordinates(count, seed=0):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        latitude, longitude = rng.choice(CAMPUSES)
+        points.append((latitude + rng.uniform(-0.002, 0.002), longitude + rng.uniform(-0.002, 0.002)))
+    return points
+
+
+def per_call(points):
+    for latitude, longitude in points:
+        TimezoneFinder().timezone_at(lng=longitude, lat=latitude)
+
+
+def shared(in_memory):
+    def run(points):
+        geocode._timezone_finder = None
+        finder = geocode.timezone_finder(in_memory=in_memory)
+        for latitude, longitude in points:
+            finder.timezone_at(lng=longitude, lat=latitude)
+    return run
+
+
+def cached(points):
+    geocode._timezone_finder = None
+    geocode._timezone_at.cache_clear()
+    for latitude, longitude in points:
+        geocode.timezone_at(latitude, longitude)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    points = coordinates(args.lookups)
+    cases = [('new TimezoneFinder per lookup', per_call),
+             ('shared TimezoneFinder', shared(False)),
+             ('shared TimezoneFinder in memory', shared(True)),
+             ('timezone_at (shared, cached)', cached)]
+
+    results = {}
+    for name, case in cases:
+        start = time.perf_counter()
+        case(points)
+        results[name] = (time.perf_counter() - start) * 1000
+        print('{0:36}{1:10.1f} ms'.format(name, results[name]))
+
+    if args.json:
+        with open(args.json, 'w') as report:
+            json.dump({'lookups': args.lookups, 'ms': results}, report, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
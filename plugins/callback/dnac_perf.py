@@ -0,0 +1,204 @@
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+    name: dnac_perf
+    type: aggregate
+    author: Jeff Andiorio (@jandiorio)
+    version_added: "2.9"
+    short_description: Summarize the DNA Center API time of every play
+    description:
+        - Collects the C(perf) key returned by the modules of this collection, the HTTP calls, bytes, task
+          status polls, time slept between polls and logins of every task.
+        - At the end of the playbook a table of the slowest endpoints and of the tasks taking the most time
+          is printed for each play, and the whole report is written as JSON.
+        - Modules return C(perf) when their I(perf) option is set or C(DNAC_PERF) is set in their environment.
+          The plugin sets C(DNAC_PERF) for the modules running on the control node unless I(enable_perf) is
+          false.
+    requirements:
+        - enable in configuration, for instance C(callbacks_enabled = wwt.ansible_dnac.dnac_perf) in ansible.cfg
+    options:
+        report_file:
+            description: JSON file the report is written to.
+            type: path
+            default: ~/.ansible/dnac/perf.json
+            env:
+                - name: DNAC_PERF_REPORT
+            ini:
+                - section: callback_dnac_perf
+                  key: report_file
+        top:
+            description: Number of endpoints and tasks listed in each table.
+            type: int
+            default: 10
+            env:
+                - name: DNAC_PERF_TOP
+            ini:
+                - section: callback_dnac_perf
+                  key: top
+        enable_perf:
+            description: Set C(DNAC_PERF) for the modules running on the control node.
+            type: bool
+            default: true
+            env:
+                - name: DNAC_PERF_ENABLE
+            ini:
+                - section: callback_dnac_perf
+                  key: enable_perf
+'''
+
+import json
+import os
+
+from ansible.plugins.callback import CallbackBase
+
+TOTALS = ['runs', 'wall_time', 'http_time', 'calls', 'bytes', 'polls', 'sleep_time', 'logins']
+
+
+def new_totals():
+    return dict((key, 0) for key in TOTALS)
+
+
+def add_totals(totals, perf):
+    totals['runs'] += 1
+    for key in TOTALS[1:]:
+        totals[key] = round(totals[key] + perf.get(key, 0), 4)
+
+
+def add_endpoints(endpoints, perf):
+    """
+    Merge the endpoints of a perf result into endpoints, keyed on method and path.
+    """
+    for endpoint in perf.get('endpoints', []):
+        merged = endpoints.setdefault((endpoint['method'], endpoint['path']), {
+            'method': endpoint['method'], 'path': endpoint['path'], 'calls': 0, 'bytes': 0, 'time': 0.0,
+            'max_time': 0.0, 'status': {}})
+        merged['calls'] += endpoint['calls']
+        merged['bytes'] += endpoint['bytes']
+        merged['time'] = round(merged['time'] + endpoint['time'], 4)
+        merged['max_time'] = max(merged['max_time'], endpoint['max_time'])
+        for status, count in endpoint['status'].items():
+            merged['status'][status] = merged['status'].get(status, 0) + count
+
+
+def human_size(size):
+    for unit in ['B', 'kB', 'MB']:
+        if size < 1000:
+            return '{0:.0f} {1}'.format(size, unit) if unit == 'B' else '{0:.1f} {1}'.format(size, unit)
+        size /= 1000.0
+    return '{0:.1f} GB'.format(size)
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'wwt.ansible_dnac.dnac_perf'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super(CallbackModule, self).__init__(display=display)
+        self.playbook = None
+        self.plays = []
+        self.play = None
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        if self.get_option('enable_perf'):
+            os.environ.setdefault('DNAC_PERF', '1')
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = os.path.basename(playbook._file_name)
+
+    def v2_playbook_on_play_start(self, play):
+        self.play = {'name': play.get_name(), 'totals': new_totals(), 'endpoints': {}, 'tasks': {}}
+        self.plays.append(self.play)
+
+    def v2_runner_on_ok(self, result):
+        self.collect(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.collect(result)
+
+    def collect(self, result):
+        """
+        Add the perf results of a task, one per loop item for loops.
+        """
+        if self.play is None:
+            return
+        results = [result._result] + [item for item in result._result.get('results', []) if isinstance(item, dict)]
+        perfs = [item['perf'] for item in results if isinstance(item.get('perf'), dict)]
+        if not perfs:
+            return
+
+        name = result._task.get_name()
+        task = self.play['tasks'].setdefault(name, dict(new_totals(), task=name, action=result._task.action, hosts=[]))
+        host = result._host.get_name()
+        if host not in task['hosts']:
+            task['hosts'].append(host)
+        for perf in perfs:
+            add_totals(self.play['totals'], perf)
+            add_totals(task, perf)
+            add_endpoints(self.play['endpoints'], perf)
+
+    def report(self):
+        """
+        :return: JSON serializable report, endpoints and tasks sorted by the time spent on them.
+        """
+        plays = []
+        for play in self.plays:
+            endpoints = sorted(play['endpoints'].values(), key=lambda endpoint: endpoint['time'], reverse=True)
+            tasks = sorted(play['tasks'].values(), key=lambda task: task['wall_time'], reverse=True)
+            plays.append({'name': play['name'], 'totals': play['totals'], 'endpoints': endpoints, 'tasks': tasks})
+        return {'playbook': self.playbook, 'plays': plays}
+
+    def display_play(self, play, top):
+        totals = play['totals']
+        self._display.banner('DNA CENTER API [{0}]'.format(play['name']))
+        self._display.display('{0} module runs, {1} calls in {2:.2f}s, {3} transferred, {4} logins, {5} polls, '
+                              '{6:.2f}s sleeping between polls'.format(
+                                  totals['runs'], totals['calls'], totals['http_time'], human_size(totals['bytes']),
+                                  totals['logins'], totals['polls'], totals['sleep_time']))
+
+        self._display.display('')
+        self._display.display('{0:<56}{1:>8}{2:>10}{3:>10}{4:>10}{5:>11}'.format(
+            'slowest endpoints', 'calls', 'total s', 'avg ms', 'max ms', 'bytes'))
+        for endpoint in play['endpoints'][:top]:
+            self._display.display('{0:<56}{1:>8}{2:>10.2f}{3:>10.1f}{4:>10.1f}{5:>11}'.format(
+                (endpoint['method'] + ' ' + endpoint['path'])[:55], endpoint['calls'], endpoint['time'],
+                endpoint['time'] * 1000 / endpoint['calls'], endpoint['max_time'] * 1000,
+                human_size(endpoint['bytes'])))
+
+        self._display.display('')
+        self._display.display('{0:<40}{1:>6}{2:>9}{3:>9}{4:>7}{5:>7}{6:>9}{7:>8}{8:>11}'.format(
+            'tasks', 'runs', 'wall s', 'http s', 'calls', 'polls', 'sleep s', 'logins', 'bytes'))
+        for task in play['tasks'][:top]:
+            self._display.display('{0:<40}{1:>6}{2:>9.2f}{3:>9.2f}{4:>7}{5:>7}{6:>9.2f}{7:>8}{8:>11}'.format(
+                task['task'][:39], task['runs'], task['wall_time'], task['http_time'], task['calls'],
+                task['polls'], task['sleep_time'], task['logins'], human_size(task['bytes'])))
+
+    def v2_playbook_on_stats(self, stats):
+        report = self.report()
+        plays = [play for play in report['plays'] if play['totals']['runs']]
+        if not plays:
+            self._display.display('No DNA Center perf results, enable the perf option of the modules or set DNAC_PERF.')
+            return
+
+        for play in plays:
+            self.display_play(play, self.get_option('top'))
+
+        path = os.path.expanduser(self.get_option('report_file'))
+        try:
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            with open(path, 'w') as report_file:
+                json.dump(report, report_file, indent=2, sort_keys=True)
+        except (IOError, OSError) as e:
+            self._display.warning('Failed to write the DNA Center perf report to {0}: {1}'.format(path, e))
+            return
+        self._display.display('')
+        self._display.display('DNA Center perf report written to {0}'.format(path))
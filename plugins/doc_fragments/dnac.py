@@ -0,0 +1,136 @@
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # Options shared by every module through dnac_argument_spec
+    DOCUMENTATION = r'''
+notes:
+  - When the task runs with C(ansible_connection=httpapi) and C(ansible_network_os=wwt.ansible_dnac.dnac)
+    requests are sent over the persistent connection of the C(wwt.ansible_dnac.dnac) httpapi plugin.
+    I(host), I(username) and I(password) are then taken from the connection and may be omitted.
+options:
+  token_cache:
+    description:
+      - Reuse the auth token obtained by a previous task against the same host and username.
+      - Tokens are stored with their expiry in I(token_cache_dir) and a fresh login is performed
+        when the cached token is expired or rejected by the controller.
+    type: bool
+    required: false
+    default: false
+  token_cache_dir:
+    description:
+      - Directory holding the cached auth tokens.  Entries are readable only by the current user.
+    type: path
+    required: false
+    default: ~/.ansible/dnac
+  settings_cache_ttl:
+    description:
+      - Seconds a snapshot of the common settings of a group read by one task is reused by the following
+        tasks against the same host.  Snapshots are stored in I(token_cache_dir) and the snapshots of every
+        group of the host are dropped before any setting is changed, child sites inherit the changed values.
+      - With C(0) the snapshot is only kept for the running task.
+    type: int
+    required: false
+    default: 0
+  perf:
+    description:
+      - Add a I(perf) key to the module result with the time spent on the controller.
+      - It holds the totals of calls, bytes, HTTP time, logins, task status polls and seconds slept between
+        polls, and the calls, bytes, status codes, total and maximum time of every endpoint.  Endpoints are
+        reported as method and path, with IDs replaced by C({id}) and without the query string.
+      - The C(DNAC_PERF) environment variable sets the default.
+    type: bool
+    required: false
+    default: false
+  trace_file:
+    description:
+      - Append OpenTelemetry spans of the module run to this file as OTLP/JSON lines, one line per run.
+      - Spans cover the login, the reads, the comparison with the requested state, the submitted changes,
+        the task polling and every HTTP call, with the controller host, endpoints and task IDs as attributes.
+        A W3C C(TRACEPARENT) environment variable makes the run part of that trace.
+      - Requires the opentelemetry-sdk package on the host running the module, tracing is disabled without it.
+      - The C(DNAC_TRACE_FILE) environment variable sets the default.
+    type: path
+    required: false
+  poll_interval:
+    description:
+      - Seconds to wait before the second status poll of an asynchronous task.  The first poll is immediate.
+      - The wait grows by I(poll_backoff) after every poll, with random jitter, up to I(poll_max_interval).
+      - The overall wait for the task is bounded by I(timeout) and a Retry-After header from the
+        controller takes precedence over the computed wait.
+    type: float
+    required: false
+    default: 0.5
+  poll_max_interval:
+    description:
+      - Upper bound in seconds for the wait between two status polls.
+    type: float
+    required: false
+    default: 10.0
+  poll_backoff:
+    description:
+      - Factor applied to the wait between status polls after every poll.
+    type: float
+    required: false
+    default: 2.0
+  wait:
+    description:
+      - Wait for the asynchronous task started by the change to complete.
+      - When C(false) the module returns as soon as the controller accepted the change, with the
+        I(task_id) or I(execution_id) to collect later with M(wwt.ansible_dnac.dnac_task_wait).
+    type: bool
+    required: false
+    default: true
+  geocode_cache:
+    description:
+      - sqlite file caching resolved addresses, shared with the C(wwt.ansible_dnac.geo) lookup plugin.
+      - Set to an empty string to always query the geocoding service.
+    type: path
+    required: false
+    default: ~/.ansible/dnac/geocode.sqlite
+  geocode_cache_ttl:
+    description:
+      - Seconds a resolved address is served from the geocode cache.
+    type: int
+    required: false
+    default: 2592000
+  geocode_cache_size:
+    description:
+      - Maximum number of addresses kept in the geocode cache, the least recently used are evicted first.
+    type: int
+    required: false
+    default: 10000
+  geocoder:
+    description:
+      - Backend resolving addresses to latitude, longitude and country.
+      - C(nominatim) queries the public OpenStreetMap service, C(gazetteer) resolves from the local I(gazetteer) file
+        without network access.
+    type: str
+    required: false
+    default: nominatim
+    choices:
+      - gazetteer
+      - nominatim
+  gazetteer:
+    description:
+      - CSV file with the columns C(address), C(latitude), C(longitude) and optionally C(country), or a sqlite file
+        with a C(gazetteer) table of those columns keyed on the normalised address (column C(key)).
+      - A CSV file is indexed into a sqlite file in the directory of I(geocode_cache), or of its default when the
+        cache is disabled, on first use and whenever it changes.  The directory of the CSV file is not written to.
+      - Required when I(geocoder=gazetteer).
+    type: path
+    required: false
+  timezone_in_memory:
+    description:
+      - Load the timezone polygon data into memory before resolving timezones instead of reading it from disk
+        on every lookup.
+      - Loading takes longer than a single lookup, so it only pays off when a task resolves many addresses.
+    type: bool
+    required: false
+    default: false
+'''
@@ -0,0 +1,88 @@
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+author: Jeff Andiorio (@jandiorio)
+httpapi: dnac
+short_description: HttpApi plugin for Cisco DNA Center
+description:
+  - Keeps one authenticated HTTPS connection to the DNA Center controller open for the whole play.
+  - Every module of the collection sends its requests through this connection when the task runs
+    with C(ansible_connection=httpapi), so login and TLS setup happen once per controller instead of
+    once per task.
+version_added: "2.9"
+'''
+
+EXAMPLES = r'''
+# inventory
+[dnac]
+dnac-prod.example.com
+
+[dnac:vars]
+ansible_connection=httpapi
+ansible_network_os=wwt.ansible_dnac.dnac
+ansible_httpapi_use_ssl=true
+ansible_httpapi_validate_certs=false
+ansible_user=admin
+ansible_password=secret
+'''
+
+import base64
+import json
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.connection import ConnectionError
+from ansible.plugins.httpapi import HttpApiBase
+
+LOGIN_PATH = '/api/system/v1/auth/token'
+BASE_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+}
+
+
+class HttpApi(HttpApiBase):
+
+    def login(self, username, password):
+        '''
+            Exchange the connection credentials for an X-Auth-Token used by
+            every following request on this connection.
+        '''
+        credentials = base64.b64encode(to_bytes('{0}:{1}'.format(username, password)))
+        headers = dict(BASE_HEADERS)
+        headers['Authorization'] = 'Basic ' + to_text(credentials)
+
+        response, response_data = self.connection.send(LOGIN_PATH, None, method='POST', headers=headers)
+
+        try:
+            token = json.loads(to_text(response_data.getvalue()))['Token']
+        except (ValueError, KeyError):
+            raise ConnectionError('failed to obtain a token from DNA Center: {0}'.format(response.getcode()))
+
+        self.connection._auth = {'X-Auth-Token': token}
+
+    def logout(self):
+        # DNA Center tokens expire on their own; there is no logout endpoint
+        self.connection._auth = None
+
+    def update_auth(self, response, response_text):
+        # the token is set once at login, cookies are not used for auth
+        return None
+
+    def send_request(self, method, path, data=None):
+        '''
+            :param method: HTTP verb
+            :param path: controller relative path including the query string
+            :param data: serialized request body
+            :return A tuple of status code, response headers and response body
+        '''
+        response, response_data = self.connection.send(path, data, method=method, headers=dict(BASE_HEADERS))
+
+        # handle_httperror hands back HTTPError objects for non 2xx codes
+        status = getattr(response, 'code', None) or response.getcode()
+
+        return status, dict(response.info()), to_text(response_data.getvalue())
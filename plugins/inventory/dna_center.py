@@ -5,7 +5,7 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 from ansible.errors import AnsibleError, AnsibleParserError
-from ansible.plugins.inventory import BaseInventoryPlugin
+from ansible.plugins.inventory import BaseInventoryPlugin, Cacheable
 
 DOCUMENTATION = r'''
     name: wwt.ansible_dnac.dna_center
@@ -14,12 +14,16 @@ DOCUMENTATION = r'''
     description:
         - Retrieves inventory from DNA Center
         - Adds inventory to ansible working inventory
+        - Uses a YAML configuration file that ends with dna_center.(yml|yaml) or dnac.(yml|yaml).
+        - The device, site and topology data can be kept in an inventory cache between runs.
+    extends_documentation_fragment:
+        - inventory_cache
 
     options:
         plugin:
             description: Name of the plugin
             required: true
-            choices: ['dna_center']
+            choices: ['dna_center', 'wwt.ansible_dnac.dna_center']
         host:
             description: FQDN of the target host
             required: true
@@ -38,21 +42,62 @@ DOCUMENTATION = r'''
             required: false
             default: true
             choices: [true, false]
+        page_size:
+            description:
+                - Number of devices requested per page of the network-device API.
+                - The controller returns at most 500 devices per page, larger values are lowered to 500.
+            required: false
+            type: int
+            default: 500
+        page_workers:
+            description:
+                - Number of network-device pages fetched at the same time.
+            required: false
+            type: int
+            default: 1
+        trace_file:
+            description:
+                - Append OpenTelemetry spans of the login, fetch and inventory build phases to this file as
+                  OTLP/JSON lines.
+                - Requires the opentelemetry-sdk package, tracing is disabled without it.
+            required: false
+            type: path
+            env:
+                - name: DNAC_TRACE_FILE
 '''
 
 EXAMPLES = r'''
     ansible-inventory --graph
 
     ansible-inventory --list
+
+    # dna_center.yml keeping the controller data for an hour in a jsonfile cache
+    plugin: dna_center
+    host: dnac.example.com
+    username: admin
+    password: secret
+    cache: true
+    cache_plugin: jsonfile
+    cache_connection: ~/.ansible/dnac_inventory
+    cache_timeout: 3600
 '''
 
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.tracing import Tracer
+
+# devices per page the network-device API returns at most
+MAX_PAGE_SIZE = 500
+
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     raise AnsibleError("Python requests module is required for this plugin.")
 
 
-class InventoryModule(BaseInventoryPlugin):
+class InventoryModule(BaseInventoryPlugin, Cacheable):
 
     NAME = 'dna_center'
 
@@ -65,11 +110,15 @@ class InventoryModule(BaseInventoryPlugin):
         self.host = None
         self.session = None
         self.use_dnac_mgmt_int = None
+        self.page_size = MAX_PAGE_SIZE
+        self.page_workers = 1
 
         # global attributes
         self._site_list = None
-        self._inventory = None
         self._host_list = None
+        self._device_sites = None
+        self._site_names = None
+        self._tracer = Tracer()
 
     def _login(self):
         '''
@@ -77,6 +126,8 @@ class InventoryModule(BaseInventoryPlugin):
         '''
         login_url = 'https://' + self.host + '/dna/system/api/v1/auth/token'
         self.session = requests.session()
+        # the site, topology and inventory pages are fetched concurrently
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=2 + self.page_workers))
         self.session.auth = self.username, self.password
         self.session.verify = False
         self.session.headers.update({'Content-Type': 'application/json'})
@@ -95,30 +146,65 @@ class InventoryModule(BaseInventoryPlugin):
 
             return login_results
 
-    def _get_inventory(self):
+    def _get_inventory_page(self, offset):
         '''
-            :return The json output from the request object response.
+            :param offset: 1 based index of the first device of the page.
+            :return A list of device dictionaries.
         '''
 
         inventory_url = 'https://' + self.host + \
             '/dna/intent/api/v1/network-device'
-        inventory_results = self.session.get(inventory_url)
+        inventory_results = self.session.get(inventory_url, params={'offset': offset,
+                                                                    'limit': self.page_size})
 
-        self._inventory = inventory_results.json()
+        if inventory_results.status_code not in [200, 201, 202, 203, 204]:
+            raise AnsibleError('failed to get inventory page at offset {}: {}'.format(
+                offset, inventory_results.status_code))
 
-        return inventory_results.json()
+        return inventory_results.json()['response']
+
+    def _get_inventory(self):
+        '''
+            Walk the network-device API page by page, fetching up to
+            page_workers pages at a time.
+
+            :return A generator of lists of device dictionaries in
+                controller order.
+        '''
+
+        offset = 1
+        if self.page_workers <= 1:
+            while True:
+                page = self._get_inventory_page(offset)
+                yield page
+                if len(page) < self.page_size:
+                    return
+                offset += self.page_size
+
+        pool = ThreadPoolExecutor(max_workers=self.page_workers)
+        try:
+            while True:
+                offsets = [offset + i * self.page_size for i in range(self.page_workers)]
+                for page in pool.map(self._get_inventory_page, offsets):
+                    yield page
+                    if len(page) < self.page_size:
+                        return
+                offset = offsets[-1] + self.page_size
+        finally:
+            pool.shutdown()
 
     def _get_hosts(self):
         '''
-             :param inventory A list of dictionaries representing
-                    the entire DNA Center inventory.
+             Consume the inventory pages as they arrive so only the reduced
+             host data is kept.
+
              :return A List of tuples that include the management IP,
                     device hostnanme, and the unique indentifier of the device.
         '''
 
         host_list = []
 
-        for host in self._inventory['response']:
+        for host in (h for page in self._get_inventory() for h in page):
             if host['type'].find('Access Point') == -1:
                 host_dict = {}
                 host_dict.update({
@@ -147,11 +233,17 @@ class InventoryModule(BaseInventoryPlugin):
 
         site_list = []
         site_dict = {}
+        # floors and buildings repeat the same few names across campuses
+        group_names = {}
 
         for site in sites:
 
+            name = group_names.get(site['name'])
+            if name is None:
+                name = group_names[site['name']] = site['name'].replace(' ', '_').lower()
+
             site_dict = {}
-            site_dict.update({'name': site['name'].replace(' ', '_').lower(),
+            site_dict.update({'name': name,
                               'id': site['id'], 'parentId': site['parentId']})
             site_list.append(site_dict)
 
@@ -159,11 +251,10 @@ class InventoryModule(BaseInventoryPlugin):
 
         return site_list
 
-    def _get_member_site(self, device_id):
+    def _get_device_sites(self):
         '''
-            :param device_id: The unique identifier of the target device.
-            :return A single string representing the name of the SITE group
-              of which the device is a member.
+            :return A dictionary mapping each device id to the id of the
+              SITE group it is a member of.
         '''
 
         url = 'https://' + self.host + \
@@ -171,21 +262,33 @@ class InventoryModule(BaseInventoryPlugin):
         results = self.session.get(url)
         devices = results.json()['response']['nodes']
 
-        # Get the one device we are looking for
-        device = [dev for dev in devices if dev['id'] == device_id][0]
+        device_sites = {}
+        for dev in devices:
+            device_sites[dev['id']] = (dev.get('additionalInfo') or {}).get('siteid')
 
-        # Extract the siteid from the device data
-        site_id = device.get('additionalInfo').get('siteid')
+        self._device_sites = device_sites
+
+        return device_sites
+
+    def _get_member_site(self, device_id):
+        '''
+            :param device_id: The unique identifier of the target device.
+            :return A single string representing the name of the SITE group
+              of which the device is a member.
+        '''
 
-        # set the site name from the self._site_list
-        site_name = [site['name'] for site in self._site_list
-                     if site['id'] == site_id]
+        # the topology is fetched once and indexed for all hosts
+        if self._device_sites is None:
+            self._get_device_sites()
+        if self._site_names is None:
+            self._site_names = dict((site['id'], site['name'])
+                                    for site in self._site_list)
+
+        # Extract the siteid from the device data
+        site_id = self._device_sites.get(device_id)
 
         # return the name if it exists
-        if len(site_name) == 1:
-            return site_name[0]
-        elif len(site_name) == 0:
-            return 'ungrouped'
+        return self._site_names.get(site_id, 'ungrouped')
 
     def _add_sites(self):
         ''' Add groups and associate them with parent groups
@@ -193,25 +296,30 @@ class InventoryModule(BaseInventoryPlugin):
              parentId
         '''
 
-        # Global is a system group and the parent of all top level groups
-        site_ids = [ste['id'] for ste in self._site_list]
-        parent_name = ''
-
-        # Add all sites
-        for site in self._site_list:
-            self.inventory.add_group(site['name'])
+        sites = dict((site['id'], site) for site in self._site_list)
+        self._site_names = dict((site_id, site['name'])
+                                for site_id, site in sites.items())
 
-        # Add parent/child relationship
+        # Add sites parents first so each parent/child edge is added once
+        # its parent group exists. Global is a system group and the parent
+        # of all top level groups.
+        added = set()
         for site in self._site_list:
-
-            if site['parentId'] in site_ids:
-                parent_name = [ste['name'] for ste in self._site_list
-                               if ste['id'] == site['parentId']][0]
-
-                try:
-                    self.inventory.add_child(parent_name, site['name'])
-                except Exception as e:
-                    raise AnsibleParserError('adding child sites failed:  {} \n {}:{}'.format(e, site['name'], parent_name))
+            lineage = []
+            while site is not None and site['id'] not in added:
+                lineage.append(site)
+                added.add(site['id'])
+                site = sites.get(site['parentId'])
+
+            for site in reversed(lineage):
+                self.inventory.add_group(site['name'])
+                if site['parentId'] in sites:
+                    parent_name = self._site_names[site['parentId']]
+                    try:
+                        self.inventory.add_child(parent_name, site['name'])
+                    except Exception as e:
+                        raise AnsibleParserError('adding child sites failed:  {} \n {}:{}'.format(
+                            e, site['name'], parent_name))
 
     def _add_hosts(self):
         """
@@ -291,21 +399,97 @@ class InventoryModule(BaseInventoryPlugin):
             self.username = self.get_option('username')
             self.password = self.get_option('password')
             self.map_mgmt_ip = self.get_option('use_dnac_mgmt_int')
+            self.page_size = self.get_option('page_size')
+            if self.page_size > MAX_PAGE_SIZE:
+                self.display.warning('page_size {0} is above the controller limit, using {1}'.format(
+                    self.page_size, MAX_PAGE_SIZE))
+                self.page_size = MAX_PAGE_SIZE
+            self.page_workers = self.get_option('page_workers')
+            self._tracer = Tracer(self.get_option('trace_file'), {'dnac.host': self.host})
         except Exception as e:
             raise AnsibleParserError('getting options failed:  {}'.format(e))
 
+        self._tracer.start('dnac.inventory', {'server.address': self.host})
+        try:
+            self._populate(path, cache)
+        except Exception as e:
+            self._tracer.finish(error=e)
+            raise
+        self._tracer.finish(attributes={'dnac.hosts': len(self._host_list), 'dnac.sites': len(self._site_list)})
+
+    def _populate(self, path, cache):
+        '''
+            Fill the inventory from the cache or the controller.
+        '''
+
+        # Serve the controller data from the inventory cache when enabled
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option('cache')
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        results = None
+        if attempt_to_read_cache:
+            try:
+                results = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if results is None:
+            with self._tracer.span('dnac.fetch'):
+                results = self._fetch()
+
+        if cache_needs_update:
+            self._cache[cache_key] = results
+
+        self._site_list = results['sites']
+        self._host_list = results['hosts']
+        self._device_sites = results['device_sites']
+
+        with self._tracer.span('dnac.inventory.build'):
+            # Add groups to the inventory
+            self._add_sites()
+
+            # Add the hosts to the inventory
+            self._add_hosts()
+
+    def _traced(self, name, function):
+        '''
+            :return A callable running function in a span, child of the
+              span current in the calling thread.
+        '''
+
+        context = contextvars.copy_context()
+
+        def run():
+            with self._tracer.span(name, {'server.address': self.host}):
+                return function()
+
+        return lambda: context.run(run)
+
+    def _fetch(self):
+        '''
+            :return A dictionary of the sites, hosts and device to site
+                mapping retrieved from DNA Center, as stored in the cache.
+        '''
+
         # Attempt login to DNAC
-        login_results = self._login()
+        with self._tracer.span('dnac.login', {'server.address': self.host}):
+            login_results = self._login()
         if login_results.status_code not in [200, 201, 202, 203]:
             raise AnsibleError('failed to login: {}'.format(login_results.status_code))
 
-        # Obtain Inventory Data
-        self._get_inventory()
-
-        # Add groups to the inventory
-        self._get_sites()
-        self._add_sites()
-
-        # Add the hosts to the inventory
-        self._get_hosts()
-        self._add_hosts()
+        # Obtain Inventory Data, the three calls are independent
+        pool = ThreadPoolExecutor(max_workers=3)
+        try:
+            futures = [pool.submit(self._traced('dnac.fetch.sites', self._get_sites)),
+                       pool.submit(self._traced('dnac.fetch.devices', self._get_hosts)),
+                       pool.submit(self._traced('dnac.fetch.topology', self._get_device_sites))]
+            for future in futures:
+                future.result()
+        finally:
+            pool.shutdown()
+
+        return {'sites': self._site_list,
+                'hosts': self._host_list,
+                'device_sites': self._device_sites}
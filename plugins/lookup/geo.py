@@ -9,50 +9,117 @@ DOCUMENTATION = """
     lookup: geo
     author: Jeff Andiorio (@jandiorio) <jandiorio(at)gmail.com>
     version_added: "2.9"
-    short_description: resolve an address to latitude and longitude
+    short_description: resolve addresses to latitude and longitude
     description:
-        - Allows you to obtain the latitude and longitude for a given address
+        - Allows you to obtain the latitude and longitude for one or many addresses
+        - Every distinct address is resolved once, results are returned in the order of the addresses.
+        - Resolved addresses are kept in a persistent cache shared with the modules of this collection,
+          so repeated lookups do not leave the host.
     options:
-      address:
-        description: address to resolve
+      _terms:
+        description: addresses to resolve
         required: True
+      cache_path:
+        description: sqlite file holding the geocode cache.  Set to an empty string to disable the cache.
+        type: str
+        default: ~/.ansible/dnac/geocode.sqlite
+      cache_ttl:
+        description: Seconds a resolved address is served from the cache.
+        type: int
+        default: 2592000
+      cache_size:
+        description: Maximum number of addresses kept, the least recently used are evicted first.
+        type: int
+        default: 10000
+      geocoder:
+        description:
+          - Backend resolving the address.  C(nominatim) queries the public OpenStreetMap service,
+            C(gazetteer) resolves from the local I(gazetteer) file without network access.
+        type: str
+        default: nominatim
+        choices: ['gazetteer', 'nominatim']
+      gazetteer:
+        description:
+          - CSV or sqlite gazetteer used when I(geocoder=gazetteer).
+            See the C(gazetteer) option of the modules for the format.
+          - A CSV file is indexed into the directory of I(cache_path).
+        type: path
+      workers:
+        description: Maximum number of concurrent requests to a remote geocoder.
+        type: int
+        default: 4
+      rate_limit:
+        description:
+          - Maximum number of requests per second to a remote geocoder.
+          - Defaults to the usage policy of the provider, one request per second for C(nominatim).
+        type: float
 """
 
 EXAMPLES = """
 - debug: msg="{{ lookup('geo','mullica hill, nj') }} is the lat long for Mullica Hill"
+
+- name: resolve the addresses of all sites in one lookup
+  set_fact:
+    site_locations: "{{ query('geo', *(sites | map(attribute='address') | list)) }}"
+
+- debug: msg="{{ lookup('geo', '1 World Wide Way, St Louis, MO', geocoder='gazetteer', gazetteer='files/sites.csv') }}"
 """
 
 RETURN = """
   _list:
     description:
-      - latitude and longitude of the provided address
+      - latitude and longitude of each provided address, in the order of the addresses
     type: list
 """
 
 from ansible.plugins.lookup import LookupBase
 from ansible.errors import AnsibleError, AnsibleParserError
 
-try:
-    from geopy.geocoders import Nominatim
-except ImportError as e:
-    raise AnsibleError('geopy python module not installed: {}'.format(e))
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.geocode import (
+    GeocodeCache, gazetteer_index_dir, geocode_many, get_geocoder)
 
 
 class LookupModule(LookupBase):
 
-    def run(self, address, variables, **kwargs):
+    def _get_geocoder(self):
+        if self.get_option('geocoder') == 'nominatim':
+            try:
+                import geopy  # noqa: F401
+            except ImportError as e:
+                raise AnsibleError('geopy python module not installed: {}'.format(e))
+
+        try:
+            return get_geocoder(self.get_option('geocoder'), self.get_option('gazetteer'),
+                                index_dir=gazetteer_index_dir(self.get_option('cache_path')))
+        except (IOError, ValueError) as e:
+            raise AnsibleError('Unable to load the geocoder: {}'.format(e))
+
+    def _get_cache(self):
+        if self.get_option('cache_path'):
+            return GeocodeCache(self.get_option('cache_path'), self.get_option('cache_ttl'),
+                                self.get_option('cache_size'))
+        return None
+
+    def run(self, terms, variables=None, **kwargs):
 
-        ret = []
+        self.set_options(var_options=variables, direct=kwargs)
+
+        addresses = self._flatten(terms)
+        geocoder = self._get_geocoder()
+        cache = self._get_cache()
 
-        geolocator = Nominatim(user_agent='dnac_ansible', timeout=30)
         try:
-            location = geolocator.geocode(address)
+            locations = geocode_many(addresses, cache, geocoder, workers=self.get_option('workers'),
+                                     rate_limit=self.get_option('rate_limit'))
         except Exception as e:
-            print(e)
             raise AnsibleParserError("Could not resolve address to lat/long:  {}".format(e))
+        finally:
+            if cache is not None:
+                cache.close()
+
+        unresolved = [address for address, location in zip(addresses, locations) if location is None]
+        if unresolved:
+            raise AnsibleError("Lookup was unable to resolve the address provided using {}:  {}".format(
+                self.get_option('geocoder'), '; '.join(unresolved)))
 
-        if location is None:
-            raise AnsibleError("Lookup was unable to resolve the address provided using geopy:  {}".format(address))
-        else:
-            ret = [{'latitude': location.latitude, 'longitude': location.longitude}]
-        return ret
+        return [{'latitude': location['latitude'], 'longitude': location['longitude']} for location in locations]
@@ -1,27 +1,401 @@
 #!/usr/bin/env python
 
 import requests
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import hashlib
 import json
+import os
+import random
+import re
+import threading
 import time
-import sys
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
+from contextlib import contextmanager
+from email.utils import mktime_tz, parsedate_tz
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
+from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.six.moves.urllib.parse import quote
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.geocode import (
+    GEOCODE_CACHE_PATH, GEOCODE_CACHE_SIZE, GEOCODE_CACHE_TTL, GEOCODERS, GeocodeCache, gazetteer_index_dir, geocode,
+    get_geocoder, timezone_at)
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.tracing import Tracer
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.utils import make_dirs
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# DNA Center issues tokens valid for one hour; used when the token does not carry an expiry.
+TOKEN_LIFETIME = 3600
+# Treat cached tokens as expired slightly early to avoid racing the controller clock.
+TOKEN_EXPIRY_MARGIN = 60
+# Requests sent at the same time by the worker pools unless a module asks for more workers.
+POOL_SIZE = 10
+# Status codes the controller uses to ask pollers to slow down.
+THROTTLE_STATUS_CODES = [429, 503]
+# Status paths of the two kinds of asynchronous jobs the controller hands back.
+TASK_PATH = 'api/v1/task/'
+EXECUTION_PATH = 'api/dnacaap/v1/dnacaap/management/execution-status/'
+GROUP_PATH = 'api/v1/group'
+SETTING_PATH = 'api/v1/commonsetting/global/'
+# Path segments folded into {id} in the perf report: numbers, UUIDs, object IDs and serials such as task-0001.
+ID_SEGMENT = re.compile(r'^(-?[0-9]+|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}|[0-9a-fA-F]{24,}|'
+                        r'[a-z]+-[0-9]+)$')
+
 dnac_argument_spec = dict(
-    host=dict(required=True, type='str'),
+    host=dict(required=False, type='str'),
     port=dict(required=False, type='str', default='443'),
-    username=dict(required=True, type='str'),
-    password=dict(required=True, type='str', no_log=True),
+    username=dict(required=False, type='str'),
+    password=dict(required=False, type='str', no_log=True),
     use_proxy=dict(required=False, type='bool', default=True),
     use_ssl=dict(type='bool', default=True),
     timeout=dict(type='int', default=30),
     validate_certs=dict(type='bool', default=False),
-    state=dict(type='str', default='present', choices=['absent', 'present', 'update', 'query'])
+    state=dict(type='str', default='present', choices=['absent', 'present', 'update', 'query']),
+    token_cache=dict(type='bool', default=False),
+    token_cache_dir=dict(type='path', default='~/.ansible/dnac'),
+    poll_interval=dict(type='float', default=0.5),
+    poll_max_interval=dict(type='float', default=10.0),
+    poll_backoff=dict(type='float', default=2.0),
+    wait=dict(type='bool', default=True),
+    settings_cache_ttl=dict(type='int', default=0),
+    perf=dict(type='bool', default=False, fallback=(env_fallback, ['DNAC_PERF'])),
+    trace_file=dict(type='path', fallback=(env_fallback, ['DNAC_TRACE_FILE'])),
+    geocode_cache=dict(type='path', default=GEOCODE_CACHE_PATH),
+    geocode_cache_ttl=dict(type='int', default=GEOCODE_CACHE_TTL),
+    geocode_cache_size=dict(type='int', default=GEOCODE_CACHE_SIZE),
+    geocoder=dict(type='str', default='nominatim', choices=sorted(GEOCODERS)),
+    gazetteer=dict(type='path'),
+    timezone_in_memory=dict(type='bool', default=False)
 )
 
 
+class TaskTimeoutError(Exception):
+    """
+    Raised when an asynchronous task does not finish before the polling deadline.
+    """
+    pass
+
+
+class TaskStatusError(Exception):
+    """
+    Raised when the status of an asynchronous task is rejected by the controller or cannot be read.
+    """
+
+    def __init__(self, msg, response=''):
+        super(TaskStatusError, self).__init__(msg)
+        self.response = response
+
+
+class AmbiguousSiteError(Exception):
+    """
+    Raised when a site name matches more than one site of the hierarchy.
+    """
+    pass
+
+
+class SiteIndex(object):
+    """
+    Index of the sites (groups) of the controller by id, groupNameHierarchy and name.
+
+    It holds the results of filtered queries, recorded in queried so each name, hierarchy or id is
+    asked for only once.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.hierarchies = {}
+        self.names = {}
+        self.queried = set()
+
+    def known(self, field, value):
+        """
+        :return: True if the index can answer a lookup of value by field without a query.
+        """
+        return (field, value) in self.queried
+
+    def add(self, group):
+        if group['id'] in self.ids:
+            return
+        self.ids[group['id']] = group
+        self.hierarchies[group.get('groupNameHierarchy')] = group
+        self.names.setdefault(group['name'], []).append(group)
+
+    def by_id(self, site_id):
+        return self.ids.get(site_id)
+
+    def by_hierarchy(self, hierarchy):
+        return self.hierarchies.get(hierarchy)
+
+    def by_name(self, name):
+        """
+        :return: The site with the given name or None.
+        :raises AmbiguousSiteError: when several sites share the name.
+        """
+        sites = self.names.get(name, [])
+        if len(sites) > 1:
+            raise AmbiguousSiteError('Site name {0} is ambiguous, it matches {1}.  Use the full hierarchy.'.format(
+                name, ', '.join(sorted(site['groupNameHierarchy'] for site in sites))))
+        return sites[0] if sites else None
+
+
+class TokenCache(object):
+    """
+    File backed store for DNA Center auth tokens keyed by controller host and username.
+
+    Access is serialized with an exclusive lock on a companion lock file so parallel forks
+    share a single login instead of each requesting a token.
+    """
+
+    def __init__(self, cache_dir, host, username):
+        key = hashlib.sha256('{0}|{1}'.format(host, username).encode('utf-8')).hexdigest()
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, 'token-' + key + '.json')
+        self.lock_path = self.path + '.lock'
+
+    @contextmanager
+    def lock(self):
+        """
+        Hold an exclusive lock on the cache entry for the duration of the block.
+        """
+        make_dirs(self.cache_dir)
+        with open(self.lock_path, 'a') as lock_file:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if HAS_FCNTL:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self):
+        """
+        :return: The cached token or None if missing, unreadable or expired.
+        """
+        try:
+            with open(self.path) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if entry.get('expires', 0) - TOKEN_EXPIRY_MARGIN <= time.time():
+            return None
+        return entry.get('token')
+
+    def set(self, token, expires):
+        """
+        Write the token and its expiry (epoch seconds) readable only by the current user.
+        """
+        tmp_path = self.path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump({'token': token, 'expires': expires}, cache_file)
+        os.rename(tmp_path, self.path)
+
+    def invalidate(self, token):
+        """
+        Drop the cache entry if it still holds the given (rejected) token.
+        """
+        if self.get() == token:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class SettingsCache(object):
+    """
+    File backed store for snapshots of the common settings of a group keyed by controller host and group.
+
+    Settings are inherited down the site hierarchy, so a change drops the snapshots of every group of the host.
+    """
+
+    def __init__(self, cache_dir, host, ttl):
+        self.cache_dir = cache_dir
+        self.host = host
+        self.ttl = ttl
+
+    def prefix(self):
+        return 'settings-' + hashlib.sha256(self.host.encode('utf-8')).hexdigest()[:16] + '-'
+
+    def path(self, group_id):
+        key = hashlib.sha256('{0}|{1}'.format(self.host, group_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, self.prefix() + key + '.json')
+
+    def get(self, group_id):
+        """
+        :return: The cached settings or None if missing, unreadable or older than ttl seconds.
+        """
+        try:
+            with open(self.path(group_id)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if entry.get('created', 0) + self.ttl <= time.time():
+            return None
+        return entry.get('settings')
+
+    def set(self, group_id, settings):
+        make_dirs(self.cache_dir)
+        path = self.path(group_id)
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump({'settings': settings, 'created': time.time()}, cache_file)
+        os.rename(tmp_path, path)
+
+    def invalidate(self):
+        for path in glob.glob(os.path.join(self.cache_dir, self.prefix() + '*.json')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def path_template(path):
+    """
+    :return: path without its query string and with the IDs replaced by {id}.
+    """
+    segments = path.split('?', 1)[0].strip('/').split('/')
+    return '/'.join('{id}' if ID_SEGMENT.match(segment) else segment for segment in segments)
+
+
+class PerfRecorder(object):
+    """
+    Timing of the HTTP calls and status polls of a module run.  Calls from worker threads are
+    recorded under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+        self.logins = 0
+        self.polls = 0
+        self.sleep = 0.0
+
+    def record(self, method, path, status, size, latency, login=False):
+        key = (method, path_template(path))
+        with self.lock:
+            endpoint = self.endpoints.setdefault(key, {'method': method, 'path': key[1], 'calls': 0, 'bytes': 0,
+                                                       'time': 0.0, 'max_time': 0.0, 'status': {}})
+            endpoint['calls'] += 1
+            endpoint['bytes'] += size
+            endpoint['time'] += latency
+            endpoint['max_time'] = max(endpoint['max_time'], latency)
+            endpoint['status'][str(status)] = endpoint['status'].get(str(status), 0) + 1
+            if login:
+                self.logins += 1
+
+    def record_poll(self):
+        with self.lock:
+            self.polls += 1
+
+    def record_sleep(self, seconds):
+        with self.lock:
+            self.sleep += seconds
+
+    def summary(self):
+        """
+        :return: dictionary of totals and of the endpoints sorted by the time spent on them.
+        """
+        with self.lock:
+            endpoints = sorted((dict(endpoint, status=dict(endpoint['status']))
+                                for endpoint in self.endpoints.values()),
+                               key=lambda endpoint: endpoint['time'], reverse=True)
+            for endpoint in endpoints:
+                endpoint['time'] = round(endpoint['time'], 4)
+                endpoint['max_time'] = round(endpoint['max_time'], 4)
+            return {
+                'wall_time': round(time.time() - self.started, 4),
+                'calls': sum(endpoint['calls'] for endpoint in endpoints),
+                'bytes': sum(endpoint['bytes'] for endpoint in endpoints),
+                'http_time': round(sum(endpoint['time'] for endpoint in endpoints), 4),
+                'logins': self.logins,
+                'polls': self.polls,
+                'sleep_time': round(self.sleep, 4),
+                'endpoints': endpoints,
+            }
+
+
+class HttpApiResponse(object):
+    """
+    Minimal stand-in for requests.Response built from the httpapi connection reply.
+    """
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.content = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def retry_after(response):
+    """
+    Parse the Retry-After header given in either delta-seconds or HTTP-date form.
+
+    :return: seconds to wait or None if the header is absent or invalid.
+    """
+    value = (response.headers or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(mktime_tz(date) - time.time(), 0)
+
+
+def task_status(response, url, unwrap=False):
+    """
+    Decode a task status lookup.
+
+    :param unwrap: Task status is nested under the response key.
+    :return: the task status, None when the controller throttled the lookup.
+    """
+    if response.status_code in THROTTLE_STATUS_CODES:
+        return None
+    if 400 <= response.status_code < 500:
+        raise TaskStatusError('task status lookup failed with status {0}: {1}'.format(
+            response.status_code, url.rsplit('/', 1)[-1]), response.text)
+    try:
+        status = response.json()
+        if unwrap:
+            status = status['response']
+    except (ValueError, KeyError, TypeError):
+        status = None
+    if not isinstance(status, dict):
+        raise TaskStatusError('unreadable task status: {0}'.format(url.rsplit('/', 1)[-1]), response.text)
+    return status
+
+
+def token_expiry(token):
+    """
+    Read the expiry from the JWT issued by DNA Center.
+
+    :param token: X-Auth-Token returned by the controller.
+    :return: expiry as epoch seconds, defaulting to TOKEN_LIFETIME from now.
+    """
+    try:
+        claims = token.split('.')[1]
+        claims += '=' * (-len(claims) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(claims.encode('ascii')).decode('utf-8'))['exp'])
+    except Exception:
+        return int(time.time()) + TOKEN_LIFETIME
+
+
 class DnaCenter(object):
 
     def __init__(self, module):
@@ -31,10 +405,29 @@ class DnaCenter(object):
         self.session = None
         self.api_path = ''
         self.response = None
+        self.token = None
+        self.token_cache = None
+        self.connection = None
+        self.site_index = None
+        self.common_settings = {}
+        self.perf = None
         self.result = dict(
             changed=False,
             original_message='',
             message='')
+
+        if self.params.get('perf'):
+            self.perf = PerfRecorder()
+        self.tracer = Tracer(self.params.get('trace_file'), {'dnac.host': self.params.get('host') or ''})
+        self.tracer.start('dnac.module', {'ansible.module': getattr(module, '_name', ''),
+                                          'server.address': self.params.get('host') or ''})
+        if self.perf is not None or self.tracer.enabled:
+            self.report_exit()
+
+        # modules running over ansible_connection=httpapi share the plugin's persistent session
+        if getattr(module, '_socket_path', None):
+            self.connection = Connection(module._socket_path)
+
         self.login()
 
     def __setattr__(self, key, value):
@@ -46,23 +439,59 @@ class DnaCenter(object):
         :return:
         """
         if key not in ['api_path', 'username', 'password', 'host', 'session', 'response', 'module', 'params',
-                       'cookie', 'credential_type', 'credential_subtype', 'credential_name', 'result']:
+                       'cookie', 'credential_type', 'credential_subtype', 'credential_name', 'result',
+                       'token', 'token_cache', 'connection', 'site_index', 'common_settings', 'perf',
+                       'tracer']:
             raise AttributeError(key + " : Attribute not permitted")
         else:
             self.__dict__[key] = value
 
+    def report_exit(self):
+        """
+        Add the perf summary to the result and write the trace in exit_json and fail_json, whichever
+        ends the module.
+        """
+        def report(method, failed):
+            def exit(**kwargs):
+                if self.perf is not None:
+                    kwargs['perf'] = self.perf.summary()
+                self.tracer.finish(error=kwargs.get('msg') if failed else None,
+                                   attributes={'dnac.changed': bool(kwargs.get('changed'))})
+                return method(**kwargs)
+            return exit
+
+        self.module.exit_json = report(self.module.exit_json, False)
+        self.module.fail_json = report(self.module.fail_json, True)
+
+    def record(self, method, path, response, start, login=False):
+        """
+        Record a completed call when perf is enabled.
+
+        :param start: time.time() before the call was sent.
+        """
+        if self.perf is not None:
+            self.perf.record(method, path, response.status_code, len(response.content or ''), time.time() - start,
+                             login=login)
+
     # Login to DNA Center
     def login(self):
         """
         Establish a session to the DNA Center Controller.
 
+        When token_cache is enabled a still valid token from a previous task is reused and the
+        auth round trip is skipped.  Over an httpapi connection the plugin owns the session and
+        nothing is done here.
+
         :return: A session object is returned.
 
         """
 
-        login_url = 'https://' + self.params['host'] + '/api/system/v1/auth/token'
-        # issue with 1.3.0.4 update broke the auth URI below - investigating
-        # login_url = 'https://' + self.params['host'] + '/dna/system/api/v1/auth/token'
+        if self.connection is not None:
+            return None
+
+        missing = [p for p in ['host', 'username', 'password'] if not self.params.get(p)]
+        if missing:
+            self.module.fail_json(msg='missing required arguments: ' + ', '.join(missing))
 
         # create a session object
         self.session = requests.session()
@@ -70,14 +499,51 @@ class DnaCenter(object):
         # set configuration elements
         self.session.auth = (self.params['username'], self.params['password'])
         self.session.verify = False
+        # keep a pooled connection per concurrent worker for the whole run
+        self.session.mount('https://', HTTPAdapter(pool_connections=1,
+                                                   pool_maxsize=max(POOL_SIZE, self.params.get('workers') or 0)))
+
+        if self.params.get('token_cache'):
+            self.token_cache = TokenCache(self.params['token_cache_dir'], self.params['host'],
+                                          self.params['username'])
+            with self.token_cache.lock():
+                self.token = self.token_cache.get()
+                if self.token is None:
+                    self.token = self.authenticate()
+                    self.token_cache.set(self.token, token_expiry(self.token))
+        else:
+            self.token = self.authenticate()
+
+        # update the headers with received sessions cookies
+        self.session.headers.update({'X-Auth-Token': self.token})
+
+        # set the content-type
+        self.session.headers.update({'content-type': 'application/json'})
+
+        # provide session object to functions
+        return self.session
+
+    def authenticate(self):
+        """
+        Request a new token from the DNA Center Controller.
+
+        :return: The token string returned by the controller.
+        """
+
+        login_url = 'https://' + self.params['host'] + '/api/system/v1/auth/token'
+        # issue with 1.3.0.4 update broke the auth URI below - investigating
+        # login_url = 'https://' + self.params['host'] + '/dna/system/api/v1/auth/token'
 
         # send to controller
+        start = time.time()
         try:
-            self.response = self.session.post(login_url)
+            with self.tracer.span('dnac.login', {'server.address': self.params['host']}):
+                self.response = self.session.post(login_url)
         except Exception as e:
             self.result['changed'] = False
             self.result['original_message'] = e
             self.module.fail_json(msg='Failed to Connect to target host.', **self.result)
+        self.record('POST', 'api/system/v1/auth/token', self.response, start, login=True)
 
         if self.response.status_code not in [200, 201, 202]:
             self.session.close()
@@ -85,38 +551,146 @@ class DnaCenter(object):
             self.result['original_message'] = self.response.content
             self.module.fail_json(msg='Failed to establish session. ', **self.result)
 
-        # update the headers with received sessions cookies
-        self.session.headers.update({'X-Auth-Token': self.response.json()['Token']})
+        return self.response.json()['Token']
 
-        # set the content-type
-        self.session.headers.update({'content-type': 'application/json'})
+    def request(self, method, path, **kwargs):
+        """
+        Send a request on the established session or the httpapi connection.
 
-        # provide session object to functions
-        return self.session
+        A 401 on a token taken from the cache means the controller no longer honours it, so the
+        cache entry is dropped and the request is retried once after a fresh login.
+
+        :param method: HTTP verb.
+        :param path: Controller relative path including any query string.
+
+        :return: The response object.
+        """
+        if self.connection is not None:
+            return self.send(method, path, lambda: self.connection_request(method, path, **kwargs))
+
+        url = 'https://' + self.params['host'] + '/' + path
+        response = self.send(method, path, lambda: self.session.request(method, url, **kwargs))
+
+        if response.status_code == 401 and self.token_cache is not None:
+            with self.token_cache.lock():
+                self.token_cache.invalidate(self.token)
+                # another fork may already have refreshed the entry
+                self.token = self.token_cache.get()
+                if self.token is None:
+                    self.token = self.authenticate()
+                    self.token_cache.set(self.token, token_expiry(self.token))
+            self.session.headers.update({'X-Auth-Token': self.token})
+            response = self.send(method, path, lambda: self.session.request(method, url, **kwargs))
+
+        return response
+
+    def send(self, method, path, call):
+        """
+        Time one call to the controller for the perf summary and the trace.
+
+        :param call: Function sending the request and returning the response.
+        """
+        attributes = None
+        if self.tracer.enabled:
+            attributes = {'http.request.method': method, 'server.address': self.params.get('host') or '',
+                          'url.template': path_template(path)}
+        with self.tracer.span('HTTP ' + method, attributes, client=True) as span:
+            start = time.time()
+            response = call()
+            self.record(method, path, response, start)
+            if span is not None:
+                span.set_attribute('http.response.status_code', response.status_code)
+        return response
 
-    def intent_task_checker(self, task_id):
+    def connection_request(self, method, path, data=None, **kwargs):
+        """
+        Send the request through the httpapi connection plugin.  Session only keyword arguments
+        such as verify are ignored.
+
+        :return: HttpApiResponse
+        """
+        if kwargs.get('json') is not None:
+            data = json.dumps(kwargs['json'])
+
+        try:
+            status, headers, text = self.connection.send_request(method, '/' + path, data)
+        except ConnectionError as e:
+            self.result['changed'] = False
+            self.result['original_message'] = str(e)
+            self.module.fail_json(msg='Failed to send request over the httpapi connection.', **self.result)
+
+        return HttpApiResponse(status, headers, text)
+
+    def wait_for_task(self, url, unwrap=False):
+        """
+        Poll an asynchronous task until it reports an endTime.
+
+        The first poll is immediate.  Following polls back off exponentially with jitter from
+        poll_interval up to poll_max_interval, and a Retry-After from the controller takes
+        precedence.  The overall wait is bounded by the timeout argument.  Client errors such as
+        an unknown task ID and unreadable status bodies end the wait with TaskStatusError.
+
+        :param url: Task status path.
+        :param unwrap: Task status is nested under the response key.
+
+        :return: Response data from the task status lookup.
+        """
+        deadline = time.time() + self.params['timeout']
+        interval = self.params['poll_interval']
+
+        with self.tracer.span('dnac.poll', {'dnac.task_id': url.rsplit('/', 1)[-1],
+                                            'dnac.endpoint': path_template(url)}) as span:
+            polls = 0
+            while True:
+                response = self.request('GET', url)
+                polls += 1
+                if span is not None:
+                    span.set_attribute('dnac.polls', polls)
+                if self.perf is not None:
+                    self.perf.record_poll()
+                status = task_status(response, url, unwrap)
+                if status is not None and status.get('endTime'):
+                    return status
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TaskTimeoutError('task did not complete within {0} seconds: {1}'.format(
+                        self.params['timeout'], url.rsplit('/', 1)[-1]))
+
+                delay = retry_after(response)
+                if delay is None:
+                    delay = random.uniform(interval / 2, interval)
+                delay = min(delay, remaining)
+                if self.perf is not None:
+                    self.perf.record_sleep(delay)
+                time.sleep(delay)
+                interval = min(interval * self.params['poll_backoff'], self.params['poll_max_interval'])
+
+    def intent_task_checker(self, task_id, exit=True):
         """
         Obtain the status of the task based on taskId for asynchronous operations.
 
         :param task_id: Internal ID assigned to asynchronous tasks.
+        :param exit: End the module when the task succeeds, otherwise return its status.
 
         :return: Response data from the task status lookup.
         """
 
         # task_checker will loop until the given task completes and return the results of the task execution
 
-        url = 'https://' + self.params['host'] + '/' + 'api/dnacaap/v1/dnacaap/management/execution-status/' + task_id
-        response = self.session.get(url)
-        response = response.json()
-        # response = response['response']
-
-        while not response.get('endTime'):
-            time.sleep(2)
-            response = self.session.get(url)
-            response = response.json()
-            # response = response['response']
+        url = EXECUTION_PATH + task_id
+        try:
+            response = self.wait_for_task(url)
+        except TaskTimeoutError as e:
+            self.result['changed'] = False
+            self.result['original_message'] = str(e)
+            self.module.fail_json(msg='Timed out waiting for the task to complete.', **self.result)
+        except TaskStatusError as e:
+            self.result['changed'] = False
+            self.result['original_message'] = e.response
+            self.module.fail_json(msg=str(e), **self.result)
 
-        if response.get('status') == 'SUCCESS' and response.get('bapiName').find('Update') >= 0:
+        if response.get('status') == 'SUCCESS' and (not exit or response.get('bapiName').find('Update') >= 0):
             return response
         elif response.get('status') == "SUCCESS":
             self.result['changed'] = True
@@ -129,30 +703,34 @@ class DnaCenter(object):
 
         return response
 
-    def task_checker(self, task_id):
+    def task_checker(self, task_id, exit=True):
         """
         Obtain the status of the task based on taskId for asynchronous operations.
 
         :param task_id: Internal ID assigned to asynchronous tasks.
+        :param exit: End the module when the task succeeds, otherwise return its status.
 
         :return: Response data from the task status lookup.
         """
 
         # task_checker will loop until the given task completes and return the results of the task execution
-        url = 'https://' + self.params['host'] + '/' + 'api/v1/task/' + task_id
-        response = self.session.get(url)
-        response = response.json()
-        response = response['response']
-
-        while not response.get('endTime'):
-            time.sleep(2)
-            response = self.session.get(url)
-            response = response.json()
-            response = response['response']
+        url = TASK_PATH + task_id
+        try:
+            response = self.wait_for_task(url, unwrap=True)
+        except TaskTimeoutError as e:
+            self.result['changed'] = False
+            self.result['original_message'] = str(e)
+            self.module.fail_json(msg='Timed out waiting for the task to complete.', **self.result)
+        except TaskStatusError as e:
+            self.result['changed'] = False
+            self.result['original_message'] = e.response
+            self.module.fail_json(msg=str(e), **self.result)
 
         if not response.get('isError'):
             self.result['changed'] = True
             self.result['original_message'] = response
+            if not exit:
+                return response
             self.module.exit_json(msg='Task completed successfully.', **self.result)
         elif response.get('isError'):
             self.result['changed'] = False
@@ -161,6 +739,76 @@ class DnaCenter(object):
 
         return response
 
+    def wait_for_tasks(self, task_ids=None, execution_ids=None, workers=POOL_SIZE):
+        """
+        Wait on many asynchronous tasks concurrently.  Each task gets its own polling deadline.
+
+        :param task_ids: IDs returned as response.taskId by the api/v1 calls.
+        :param execution_ids: IDs returned as executionId by the intent API calls.
+        :param workers: Maximum number of tasks polled at the same time.
+
+        :return: List of dicts with id, type, failed and the final task status in input order, plus the
+            response body when the status lookup failed.
+        """
+        jobs = [(task_id, 'task') for task_id in task_ids or []] + \
+            [(execution_id, 'execution') for execution_id in execution_ids or []]
+        if not jobs:
+            return []
+
+        workers = min(workers, len(jobs))
+
+        def wait(job):
+            task_id, task_type = job
+            result = dict(id=task_id, type=task_type, failed=False, msg='', status={})
+            try:
+                if task_type == 'task':
+                    result['status'] = self.wait_for_task(TASK_PATH + task_id, unwrap=True)
+                    result['failed'] = bool(result['status'].get('isError'))
+                else:
+                    result['status'] = self.wait_for_task(EXECUTION_PATH + task_id)
+                    result['failed'] = result['status'].get('status') != 'SUCCESS'
+            except TaskTimeoutError as e:
+                result['failed'] = True
+                result['msg'] = str(e)
+            except TaskStatusError as e:
+                result['failed'] = True
+                result['msg'] = str(e)
+                result['response'] = e.response
+            return result
+
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            return list(pool.map(wait, jobs))
+        finally:
+            pool.shutdown()
+
+    def task_handler(self, url, r, wait=None):
+        """
+        Hand the task returned by a create, update or delete call to the matching checker or,
+        with wait disabled, exit with its ID so it can be collected later by dnac_task_wait.
+
+        :param url: Path the request was sent to.
+        :param r: Decoded response body.
+        :param wait: Override the wait module argument.  True is meant for calls later steps depend on,
+            the task is waited for and the module continues once it succeeded.
+        """
+        dependent = wait is True
+        if wait is None:
+            wait = self.params['wait']
+
+        if not wait:
+            self.result['changed'] = True
+            if url.find('intent') >= 0:
+                self.result['execution_id'] = r['executionId']
+            else:
+                self.result['task_id'] = r['response']['taskId']
+            self.module.exit_json(msg='Task submitted.', **self.result)
+
+        if url.find('intent') >= 0:
+            return self.intent_task_checker(r['executionId'], exit=not dependent)
+        else:
+            return self.task_checker(r['response']['taskId'], exit=not dependent)
+
     # generalized get object function
     def get_obj(self):
         """
@@ -170,8 +818,9 @@ class DnaCenter(object):
 
         """
 
-        url = 'https://' + self.params['host'] + '/' + self.api_path.rstrip('/')
-        response = self.session.get(url)
+        url = self.api_path.rstrip('/')
+        with self.tracer.span('dnac.fetch', {'dnac.endpoint': path_template(url)}):
+            response = self.request('GET', url)
         if response.status_code in [200, 201, 202]:
             try:
                 r = response.json()
@@ -196,32 +845,43 @@ class DnaCenter(object):
             self.result['original_message'] = response.text
             self.module.fail_json(msg='Failed to get object!', **self.result)
 
+    def set_diff(self, before, after):
+        """
+        Record the change for --diff, computed from the state read before the change.
+
+        :param before: Current object or setting, {} when it is created.
+        :param after: Proposed object or setting, {} when it is deleted.
+        """
+        if getattr(self.module, '_diff', False):
+            self.result['diff'] = dict(before=before, after=after)
+
     # generalized create call
-    def create_obj(self, payload):
+    def create_obj(self, payload, wait=None):
         """
         Create object in DNA Center Controller.
 
         :param payload: Data structure formatted for the specific call and target setting or attribute.
+        :param wait: Override the wait module argument.
 
         :return: JSON data structure returned from a successful call or the response object.
         """
+        if 'diff' not in self.result:
+            self.set_diff({}, payload)
         try:
             payload = json.dumps(payload)
             # self.module.fail_json(msg=payload)
         except Exception:
             self.module.fail_json(msg='failed to convert payload to json.  invalid json')
-        url = "https://" + self.params['host'] + '/' + self.api_path.rstrip('/')
+        url = self.api_path.rstrip('/')
 
         if not self.module.check_mode:
 
-            response = self.session.post(url, data=payload)
+            with self.tracer.span('dnac.submit', {'dnac.endpoint': 'POST ' + path_template(url)}):
+                response = self.request('POST', url, data=payload)
             if response.status_code in [200, 201, 202]:
                 r = response.json()
                 try:
-                    if url.find('intent') >= 0:
-                        self.intent_task_checker(r['executionId'])
-                    else:
-                        self.task_checker(r['response']['taskId'])
+                    self.task_handler(url, r, wait)
 
                 except Exception as e:
                     self.result['original_message'] = e
@@ -235,22 +895,22 @@ class DnaCenter(object):
             self.module.exit_json(msg='In check_mode.  Changes would be required.', **self.result)
 
     # generalized delete call
-    def delete_obj(self, payload):
+    def delete_obj(self, payload, wait=None):
         """
 
         :param payload: ID of the attribute to be deleted.
+        :param wait: Override the wait module argument.
         :return: JSON data structure returned from a successful call or the response object.
         """
+        if 'diff' not in self.result:
+            self.set_diff({'id': payload}, {})
         if not self.module.check_mode:
-            url = 'https://' + self.params['host'] + '/' + self.api_path.rstrip('/') + '/' + payload
-            response = self.session.delete(url)
+            url = self.api_path.rstrip('/') + '/' + payload
+            with self.tracer.span('dnac.submit', {'dnac.endpoint': 'DELETE ' + path_template(url)}):
+                response = self.request('DELETE', url)
             if response.status_code in [200, 201, 202]:
                 r = response.json()
-                # if self.api_path.find('dna'):
-                if url.find('intent') >= 0:
-                    self.intent_task_checker(r['executionId'])
-                else:
-                    self.task_checker(r['response']['taskId'])
+                self.task_handler(url, r, wait)
             else:
                 self.result['changed'] = False
                 self.result['original_message'] = response.text
@@ -260,34 +920,137 @@ class DnaCenter(object):
             self.module.exit_json(msg='In check_mode.  Changes would be required.', **self.result)
 
     # generalized update call
-    def update_obj(self, payload):
-        url = 'https://' + self.params['host'] + '/' + self.api_path.rstrip('/')
-        response = self.session.request(method='PUT', url=url, json=payload, verify=False)
+    def update_obj(self, payload, wait=None, diff=True):
+        """
+        Update object in DNA Center Controller.
+
+        :param payload: Data structure formatted for the specific call and target setting or attribute.
+        :param wait: Override the wait module argument.
+        :param diff: False when the current state cannot be read, no diff is reported rather than one of a creation.
+        """
+        if diff and 'diff' not in self.result:
+            self.set_diff({}, payload)
+        if self.module.check_mode:
+            self.result['changed'] = True
+            self.module.exit_json(msg='In check_mode.  Changes would be required.', **self.result)
+
+        url = self.api_path.rstrip('/')
+        with self.tracer.span('dnac.submit', {'dnac.endpoint': 'PUT ' + path_template(url)}):
+            response = self.request('PUT', url, json=payload, verify=False)
 
         if response.status_code in [200, 201, 202]:
             r = response.json()
-            if url.find('intent') >= 0:
-                self.intent_task_checker(r['executionId'])
-            else:
-                self.task_checker(r['response']['taskId'])
+            self.task_handler(url, r, wait)
 
         else:
             self.result['changed'] = False
             self.result['original_message'] = response.text
             self.module.fail_json(msg='Failed to update object!', **self.result)
 
+    def get_groups(self, path):
+        """
+        :return: list of groups returned by a group query.
+        """
+        return self.response_groups(self.query_groups(path))
+
+    def query_groups(self, path):
+        """
+        Send a group query without checking the response, safe to call from worker threads.
+
+        :return: The response object.
+        """
+        with self.tracer.span('dnac.fetch', {'dnac.endpoint': path_template(path)}):
+            return self.request('GET', path)
+
+    def response_groups(self, response):
+        """
+        :return: list of groups of a group query response, fails the module on an error status.
+        """
+        if response.status_code == 404:
+            return []
+        if response.status_code not in [200, 201, 202]:
+            self.result['changed'] = False
+            self.result['original_message'] = response.text
+            self.module.fail_json(msg='Failed to get the site hierarchy!', **self.result)
+        groups = response.json().get('response') or []
+        # a lookup by id returns the group itself
+        if isinstance(groups, dict):
+            groups = [groups]
+        return groups
+
+    def find_sites(self, names=None, hierarchies=None, site_ids=None, workers=POOL_SIZE):
+        """
+        Resolve sites with server side filtered queries, several at the same time.  Results are
+        added to the site index and every name, hierarchy and id is queried once per run.
+
+        :return: SiteIndex holding at least the requested sites.
+        """
+        if self.site_index is None:
+            self.site_index = SiteIndex()
+        index = self.site_index
+
+        # as in get_site, names starting with Global/ are hierarchies
+        queries = [('hierarchy' if str(name).startswith('Global/') else 'name', name) for name in names or []] + \
+            [('hierarchy', hierarchy) for hierarchy in hierarchies or []] + \
+            [('id', site_id) for site_id in site_ids or []]
+        queries = [query for query in set(queries) if query[1] is not None and not index.known(*query)]
+        if not queries:
+            return index
+
+        # workers only send the queries, responses are checked here so fail_json runs once on this thread
+        def query(job):
+            field, value = job
+            if field == 'id':
+                return self.query_groups(GROUP_PATH + '/' + quote(value, safe=''))
+            key = 'groupName' if field == 'name' else 'groupNameHierarchy'
+            return self.query_groups(GROUP_PATH + '?' + key + '=' + quote(value, safe=''))
+
+        if len(queries) == 1:
+            responses = [query(queries[0])]
+        else:
+            pool = ThreadPoolExecutor(max_workers=min(workers, len(queries)))
+            try:
+                responses = list(pool.map(query, queries))
+            finally:
+                pool.shutdown()
+
+        for job, response in zip(queries, responses):
+            groups = self.response_groups(response)
+            index.queried.add(job)
+            for group in groups:
+                index.add(group)
+        return index
+
+    def get_site(self, name=None, hierarchy=None, site_id=None):
+        """
+        Look up a site by name, groupNameHierarchy or id.  Fails when the name is ambiguous.  A name
+        starting with Global/ is taken as a groupNameHierarchy.
+
+        :return: The site dictionary or None.
+        """
+        if hierarchy is None and name is not None and name.startswith('Global/'):
+            hierarchy = name
+
+        if site_id is not None:
+            return self.find_sites(site_ids=[site_id]).by_id(site_id)
+        if hierarchy is not None:
+            return self.find_sites(hierarchies=[hierarchy]).by_hierarchy(hierarchy)
+        sites = self.find_sites(names=[name])
+        try:
+            return sites.by_name(name)
+        except AmbiguousSiteError as e:
+            self.result['changed'] = False
+            self.module.fail_json(msg=str(e), **self.result)
+
     # Group ID lookup
     def get_group_id(self, group_name):
 
-        if (self.module.params['group_name'] == '-1' or self.module.params['group_name'].lower() == 'global'):
+        if group_name == '-1' or group_name.lower() == 'global':
             return '-1'
         else:
-            self.api_path = 'api/v1/group'
-            groups = self.get_obj()
-            group_ids = [group['id'] for group in groups['response'] if group['name'] == group_name]
-            if len(group_ids) == 1:
-                group_id = group_ids[0]
-                return group_id
+            site = self.get_site(group_name)
+            if site is not None:
+                return site['id']
 
     def parse_geo(self, address):
         """
@@ -298,19 +1061,39 @@ class DnaCenter(object):
         :return: attributes dictionary
         """
 
-        geolocator = Nominatim(user_agent='dnac_ansible', timeout=30)
+        geocoder_name = self.params.get('geocoder') or 'nominatim'
+
+        # imported on use, most modules never geocode
+        if geocoder_name == 'nominatim':
+            try:
+                import geopy  # noqa: F401
+            except ImportError:
+                self.module.fail_json(msg='geopy is required to resolve addresses.  pip install geopy')
+
+        cache = None
+        if self.params.get('geocode_cache'):
+            cache = GeocodeCache(self.params['geocode_cache'], self.params['geocode_cache_ttl'],
+                                 self.params['geocode_cache_size'])
         try:
-            location = geolocator.geocode(address)
+            geocoder = get_geocoder(geocoder_name, self.params.get('gazetteer'),
+                                    index_dir=gazetteer_index_dir(self.params.get('geocode_cache')))
+            location = geocode(address, cache, geocoder)
         except Exception as e:
-            print(e)
-            sys.exit(0)
-
-        location_parts = location.address.split(',')
-        country = location_parts[len(location_parts) - 1]
-        attributes = {'address': location.address,
+            self.result['original_message'] = str(e)
+            self.module.fail_json(msg='Failed to resolve address.', **self.result)
+        finally:
+            if cache is not None:
+                cache.close()
+
+        if location is None:
+            self.module.fail_json(msg='Unable to resolve address: ' + address, **self.result)
+
+        location_parts = location['address'].split(',')
+        country = location.get('country') or location_parts[len(location_parts) - 1]
+        attributes = {'address': location['address'],
                       'country': country,
-                      'latitude': location.latitude,
-                      'longitude': location.longitude,
+                      'latitude': location['latitude'],
+                      'longitude': location['longitude'],
                       'type': 'building'
                       }
         return attributes
@@ -324,11 +1107,81 @@ class DnaCenter(object):
         :return: string of timezone based on address provided
 
         """
+        try:
+            import timezonefinder  # noqa: F401
+        except ImportError:
+            self.module.fail_json(msg='timezonefinder is required to resolve timezones.  pip install timezonefinder')
+
         location_attributes = self.parse_geo(address)
-        tf = TimezoneFinder()
-        tz = tf.timezone_at(lng=location_attributes['longitude'], lat=location_attributes['latitude'])
+        tz = timezone_at(location_attributes['latitude'], location_attributes['longitude'],
+                         in_memory=self.params.get('timezone_in_memory', False))
         return tz
 
+    def settings_cache(self):
+        if self.params.get('settings_cache_ttl') and self.params.get('host'):
+            return SettingsCache(self.params['token_cache_dir'], self.params['host'], self.params['settings_cache_ttl'])
+        return None
+
+    def load_common_settings(self, group_ids, workers=POOL_SIZE):
+        """
+        Fetch every common setting key of the groups, one GET per group and the groups concurrently.
+
+        Snapshots are kept for the rest of the run and, with settings_cache_ttl, shared with the following
+        tasks through a file in token_cache_dir.
+
+        :return: dictionary of group id to a dictionary of setting key to setting.
+        """
+        cache = self.settings_cache()
+        missing = [group_id for group_id in set(group_ids) if group_id not in self.common_settings]
+        if cache is not None:
+            for group_id in list(missing):
+                settings = cache.get(group_id)
+                if settings is not None:
+                    self.common_settings[group_id] = settings
+                    missing.remove(group_id)
+
+        def fetch(group_id):
+            return self.request('GET', SETTING_PATH + group_id)
+
+        with self.tracer.span('dnac.fetch', {'dnac.endpoint': path_template(SETTING_PATH + '-1'),
+                                             'dnac.groups': len(missing)}):
+            if len(missing) > 1:
+                pool = ThreadPoolExecutor(max_workers=min(workers, len(missing)))
+                try:
+                    responses = list(pool.map(fetch, missing))
+                finally:
+                    pool.shutdown()
+            else:
+                responses = [fetch(group_id) for group_id in missing]
+
+        for group_id, response in zip(missing, responses):
+            if response.status_code not in [200, 201, 202]:
+                self.result['changed'] = False
+                self.result['original_message'] = response.text
+                self.module.fail_json(msg='Failed to get the settings of group {0}!'.format(group_id), **self.result)
+            settings = dict((setting['key'], setting) for setting in response.json()['response'])
+            self.common_settings[group_id] = settings
+            if cache is not None:
+                cache.set(group_id, settings)
+
+        return dict((group_id, self.common_settings[group_id]) for group_id in group_ids)
+
+    def get_common_settings(self, group_id):
+        """
+        :return: dictionary of setting key to the current setting of the group.
+        """
+        return self.load_common_settings([group_id])[group_id]
+
+    def invalidate_common_settings(self):
+        """
+        Drop the snapshots of every group before settings are changed, the children of the changed group
+        inherit its settings.
+        """
+        self.common_settings.clear()
+        cache = self.settings_cache()
+        if cache is not None:
+            cache.invalidate()
+
     def process_common_settings(self, payload, group_id):
 
         if group_id:
@@ -341,19 +1194,24 @@ class DnaCenter(object):
         # Define local variables
         state = self.module.params['state']
 
-        # Get current settings
-        settings = self.get_obj()
-        settings = settings['response']
-        setting_count = len(settings)
+        # Get current settings from the snapshot of all keys of the group
+        current = self.get_common_settings(group_id).get(payload[0]['key'])
+
+        with self.tracer.span('dnac.diff', {'dnac.group_id': group_id, 'dnac.setting': payload[0]['key']}):
+            settings = [current] if current else []
+            setting_count = len(settings)
 
-        # Save the existing and proposed datasets
-        self.result['previous'] = settings
-        self.result['proprosed'] = payload
+            # Save the existing and proposed datasets
+            self.result['previous'] = settings
+            self.result['proprosed'] = payload
+            self.set_diff({payload[0]['key']: current['value'] if current else []},
+                          {payload[0]['key']: [] if state == 'absent' else payload[0]['value']})
 
         if state == 'present':
             if setting_count == 1:
                 # compare previous to proposed
                 if settings[0]['value'] != payload[0]['value']:
+                    self.invalidate_common_settings()
                     self.create_obj(payload)
                 else:
                     self.result['changed'] = False
@@ -361,10 +1219,12 @@ class DnaCenter(object):
                     self.module.exit_json(**self.result)
             elif setting_count == 0:
                 # create the object
+                self.invalidate_common_settings()
                 self.create_obj(payload)
 
         elif state == 'absent':
             payload[0].update({'value': []})
+            self.invalidate_common_settings()
             self.create_obj(payload)
 
 
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.utils import make_dirs
+
+# Addresses rarely move; keep resolved coordinates for 30 days by default.
+GEOCODE_CACHE_TTL = 30 * 24 * 3600
+GEOCODE_CACHE_SIZE = 10000
+GEOCODE_CACHE_PATH = '~/.ansible/dnac/geocode.sqlite'
+# Coordinates are rounded to about 100 meters before the timezone lookup; buildings of one campus share a result.
+TIMEZONE_PRECISION = 3
+
+_timezone_finder = None
+
+
+def normalize_address(address):
+    """
+    Reduce an address to the cache key form: lower case, single spaces and no space around commas.
+
+    :param address: Physical address as written in the playbook.
+    :return: normalised address string
+    """
+    address = re.sub(r'\s+', ' ', address.strip().lower())
+    return re.sub(r'\s*,\s*', ',', address)
+
+
+def gazetteer_index_dir(cache_path):
+    """
+    :param cache_path: geocode cache file, empty when the cache is disabled.
+    :return: directory CSV gazetteers are indexed into, the directory of the geocode cache or of its default.
+    """
+    return os.path.dirname(os.path.expanduser(cache_path or GEOCODE_CACHE_PATH))
+
+
+class GeocodeCache(object):
+    """
+    Persistent sqlite cache of geocoding results keyed on the normalised address.
+
+    Entries older than ttl seconds are ignored and the least recently used entries are evicted
+    once the cache holds more than max_entries addresses.  sqlite serializes concurrent writers so
+    the cache can be shared by parallel forks and by the geo lookup plugin.
+    """
+
+    def __init__(self, path=GEOCODE_CACHE_PATH, ttl=GEOCODE_CACHE_TTL, max_entries=GEOCODE_CACHE_SIZE):
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            make_dirs(cache_dir)
+
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS geocode ('
+                            'address TEXT PRIMARY KEY, location TEXT NOT NULL, '
+                            'created REAL NOT NULL, accessed REAL NOT NULL)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed)')
+
+    def get(self, address):
+        """
+        :param address: Physical address.
+        :return: location dictionary or None if the address is not cached or the entry expired.
+        """
+        key = normalize_address(address)
+        now = time.time()
+        with self.db:
+            row = self.db.execute('SELECT location FROM geocode WHERE address = ? AND created > ?',
+                                  (key, now - self.ttl)).fetchone()
+            if row is None:
+                return None
+            self.db.execute('UPDATE geocode SET accessed = ? WHERE address = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, address, location):
+        """
+        Store a location and evict the least recently used entries beyond max_entries.
+
+        :param address: Physical address.
+        :param location: dictionary with address, latitude and longitude.
+        """
+        now = time.time()
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO geocode (address, location, created, accessed) '
+                            'VALUES (?, ?, ?, ?)', (normalize_address(address), json.dumps(location), now, now))
+            self.db.execute('DELETE FROM geocode WHERE address IN (SELECT address FROM geocode '
+                            'ORDER BY accessed DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def close(self):
+        self.db.close()
+
+
+class NominatimGeocoder(object):
+    """
+    Resolve addresses with the public OpenStreetMap Nominatim service.
+    """
+
+    # results come from the network and are worth caching
+    remote = True
+    # the usage policy of the public service allows one request per second
+    rate_limit = 1.0
+
+    def __init__(self, timeout=30):
+        from geopy.geocoders import Nominatim
+
+        self.geolocator = Nominatim(user_agent='dnac_ansible', timeout=timeout)
+
+    def geocode(self, address):
+        """
+        :return: dictionary with address, latitude and longitude or None if the address is unknown.
+        """
+        result = self.geolocator.geocode(address)
+        if result is None:
+            return None
+        return {'address': result.address,
+                'latitude': result.latitude,
+                'longitude': result.longitude}
+
+
+class GazetteerGeocoder(object):
+    """
+    Resolve addresses from a local gazetteer without network access.
+
+    The gazetteer is either a CSV file with the columns address, latitude, longitude and optionally
+    country, or a sqlite file with a gazetteer table of the same columns plus the normalised address
+    as primary key (column key).  A CSV file is indexed into a sqlite file of index_dir named after the
+    CSV path, modification time and size, so it is re-indexed whenever the CSV file changes and the
+    directory of the CSV file is never written to.
+    """
+
+    remote = False
+    rate_limit = None
+
+    def __init__(self, path, index_dir=None):
+        self.path = os.path.expanduser(path)
+        if not os.path.isfile(self.path):
+            raise IOError('gazetteer not found: {0}'.format(self.path))
+
+        db_path = self.path
+        if self.path.lower().endswith('.csv'):
+            index_dir = index_dir or gazetteer_index_dir(None)
+            source, db_path = self.index_path(index_dir)
+            if not os.path.isfile(db_path):
+                make_dirs(index_dir)
+                self.index_csv(self.path, db_path)
+                self.remove_stale_indexes(index_dir, source, db_path)
+
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+
+    def index_path(self, index_dir):
+        """
+        :return: key of the CSV path and sqlite index of the current content of the CSV file.
+        """
+        stat = os.stat(self.path)
+        source = hashlib.sha1(os.path.abspath(self.path).encode('utf-8')).hexdigest()[:16]
+        version = hashlib.sha1('{0}:{1}'.format(stat.st_mtime, stat.st_size).encode('utf-8')).hexdigest()[:16]
+        return source, os.path.join(index_dir, 'gazetteer-{0}-{1}.sqlite'.format(source, version))
+
+    @staticmethod
+    def remove_stale_indexes(index_dir, source, db_path):
+        """
+        Remove the indexes of former versions of the CSV file.
+        """
+        for path in glob.glob(os.path.join(index_dir, 'gazetteer-{0}-*.sqlite'.format(source))):
+            if path != db_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def index_csv(csv_path, db_path):
+        """
+        Load the CSV gazetteer into a sqlite file indexed on the normalised address.
+        """
+        # every fork builds its own file, the rename swaps a complete index in atomically
+        tmp_path = '{0}.{1}.tmp'.format(db_path, os.getpid())
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        db = sqlite3.connect(tmp_path)
+        try:
+            with db:
+                db.execute('CREATE TABLE gazetteer (key TEXT PRIMARY KEY, address TEXT NOT NULL, '
+                           'latitude REAL NOT NULL, longitude REAL NOT NULL, country TEXT)')
+                with open(csv_path) as csv_file:
+                    rows = ((normalize_address(row['address']), row['address'].strip(), float(row['latitude']),
+                             float(row['longitude']), (row.get('country') or '').strip() or None)
+                            for row in csv.DictReader(csv_file))
+                    db.executemany('INSERT OR REPLACE INTO gazetteer VALUES (?, ?, ?, ?, ?)', rows)
+        except Exception:
+            db.close()
+            os.remove(tmp_path)
+            raise
+        db.close()
+        os.rename(tmp_path, db_path)
+
+    def geocode(self, address):
+        """
+        :return: dictionary with address, latitude, longitude and country or None if the address is unknown.
+        """
+        row = self.db.execute('SELECT address, latitude, longitude, country FROM gazetteer WHERE key = ?',
+                              (normalize_address(address),)).fetchone()
+        if row is None:
+            return None
+        location = {'address': row[0], 'latitude': row[1], 'longitude': row[2]}
+        if row[3]:
+            location['country'] = row[3]
+        return location
+
+
+GEOCODERS = {
+    'nominatim': NominatimGeocoder,
+    'gazetteer': GazetteerGeocoder,
+}
+
+
+def get_geocoder(name='nominatim', gazetteer=None, timeout=30, index_dir=None):
+    """
+    Build the geocoder backend selected by name.
+
+    :param name: nominatim or gazetteer.
+    :param gazetteer: CSV or sqlite file used by the gazetteer backend.
+    :param index_dir: directory a CSV gazetteer is indexed into, see gazetteer_index_dir.
+    """
+    if name == 'gazetteer':
+        if not gazetteer:
+            raise ValueError('the gazetteer geocoder requires the path of a gazetteer file')
+        return GazetteerGeocoder(gazetteer, index_dir)
+    elif name == 'nominatim':
+        return NominatimGeocoder(timeout=timeout)
+    raise ValueError('unknown geocoder {0}, expected one of {1}'.format(name, ', '.join(sorted(GEOCODERS))))
+
+
+def geocode(address, cache=None, geocoder=None):
+    """
+    Resolve an address, serving repeated lookups of a remote backend from the cache.
+
+    :param address: Physical address to lookup.
+    :param cache: Optional GeocodeCache.
+    :param geocoder: Backend built by get_geocoder, Nominatim by default.
+
+    :return: dictionary with address, latitude and longitude or None if the address is unknown.
+    """
+    use_cache = cache is not None and (geocoder is None or geocoder.remote)
+    if use_cache:
+        location = cache.get(address)
+        if location is not None:
+            return location
+
+    if geocoder is None:
+        geocoder = NominatimGeocoder()
+
+    location = geocoder.geocode(address)
+    if location is not None and use_cache:
+        cache.set(address, location)
+    return location
+
+
+class RateLimiter(object):
+    """
+    Space out calls shared by several threads to at most rate per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next_call = 0
+
+    def wait(self):
+        with self.lock:
+            now = time.time()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def geocode_many(addresses, cache=None, geocoder=None, workers=4, rate_limit=None):
+    """
+    Resolve a batch of addresses.
+
+    Each distinct address is resolved once.  Remote backends are served from the cache first and the
+    remaining addresses are resolved by a pool of workers, issuing no more than rate_limit requests per
+    second (the provider limit of the backend by default).  Results are cached from the calling thread.
+
+    :param addresses: Physical addresses to lookup.
+    :param cache: Optional GeocodeCache.
+    :param geocoder: Backend built by get_geocoder, Nominatim by default.
+    :param workers: Maximum number of concurrent requests to a remote backend.
+    :param rate_limit: Requests per second, overrides the limit of the backend.
+
+    :return: list of locations (None for unknown addresses) in the order of addresses.
+    """
+    keys = [normalize_address(address) for address in addresses]
+    pending = {}
+    for key, address in zip(keys, addresses):
+        pending.setdefault(key, address)
+
+    remote = geocoder is None or geocoder.remote
+    use_cache = cache is not None and remote
+    locations = {}
+    if use_cache:
+        locations = dict((key, cache.get(address)) for key, address in pending.items())
+        locations = dict((key, location) for key, location in locations.items() if location is not None)
+        pending = dict((key, address) for key, address in pending.items() if key not in locations)
+
+    if pending:
+        if geocoder is None:
+            geocoder = NominatimGeocoder()
+        limiter = RateLimiter(rate_limit or geocoder.rate_limit)
+
+        def resolve(address):
+            limiter.wait()
+            return geocoder.geocode(address)
+
+        if remote and workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                locations.update(zip(pending, executor.map(resolve, pending.values())))
+        else:
+            locations.update(zip(pending, map(resolve, pending.values())))
+
+        if use_cache:
+            for key, address in pending.items():
+                if locations[key] is not None:
+                    cache.set(address, locations[key])
+
+    return [locations[key] for key in keys]
+
+
+def timezone_finder(in_memory=False):
+    """
+    Return the process wide TimezoneFinder, loading the timezone polygon data on first use only.
+
+    :param in_memory: Load the polygon data into memory instead of reading it from disk per lookup.
+        Only honoured by the first call.
+    """
+    global _timezone_finder
+
+    if _timezone_finder is None:
+        from timezonefinder import TimezoneFinder
+
+        try:
+            _timezone_finder = TimezoneFinder(in_memory=in_memory)
+        except TypeError:
+            # releases before in_memory was introduced
+            _timezone_finder = TimezoneFinder()
+    return _timezone_finder
+
+
+@lru_cache(maxsize=1024)
+def _timezone_at(latitude, longitude, in_memory=False):
+    return timezone_finder(in_memory).timezone_at(lng=longitude, lat=latitude)
+
+
+def timezone_at(latitude, longitude, in_memory=False):
+    """
+    Resolve the timezone name for a coordinate.  Lookups are cached on the rounded coordinate.
+
+    :param in_memory: Passed to timezone_finder, worth it when a process resolves many coordinates.
+    :return: timezone name such as America/Chicago or None for coordinates without a timezone.
+    """
+    return _timezone_at(round(float(latitude), TIMEZONE_PRECISION), round(float(longitude), TIMEZONE_PRECISION),
+                        in_memory)
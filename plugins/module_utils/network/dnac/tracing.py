@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.utils import make_dirs
+
+# OTLP SpanKind values, the python API numbers its SpanKind from INTERNAL = 0
+OTLP_SPAN_KIND_OFFSET = 1
+
+
+def otlp_value(value):
+    """
+    :return: OTLP/JSON AnyValue of an attribute value.
+    """
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        # 64 bit integers are strings in OTLP/JSON
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [otlp_value(item) for item in value]}}
+    return {'stringValue': str(value)}
+
+
+def otlp_attributes(attributes):
+    return [{'key': key, 'value': otlp_value(value)} for key, value in (attributes or {}).items()]
+
+
+def otlp_span(span):
+    """
+    :param span: Finished opentelemetry.sdk.trace.ReadableSpan.
+    :return: OTLP/JSON Span.
+    """
+    context = span.get_span_context()
+    document = {
+        'traceId': '{0:032x}'.format(context.trace_id),
+        'spanId': '{0:016x}'.format(context.span_id),
+        'name': span.name,
+        'kind': span.kind.value + OTLP_SPAN_KIND_OFFSET,
+        'startTimeUnixNano': str(span.start_time),
+        'endTimeUnixNano': str(span.end_time),
+        'attributes': otlp_attributes(span.attributes),
+        'status': {'code': span.status.status_code.value},
+    }
+    if span.parent is not None:
+        document['parentSpanId'] = '{0:016x}'.format(span.parent.span_id)
+    if span.status.description:
+        document['status']['message'] = span.status.description
+    if span.events:
+        document['events'] = [{'timeUnixNano': str(event.timestamp), 'name': event.name,
+                               'attributes': otlp_attributes(event.attributes)} for event in span.events]
+    return document
+
+
+class OtlpJsonFileExporter(object):
+    """
+    Span exporter appending one OTLP/JSON ExportTraceServiceRequest per export to a file, the format read by
+    the file receiver of the OpenTelemetry collector.  Each export is a single append so parallel forks can
+    share the file.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            make_dirs(directory)
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        resources = {}
+        for span in spans:
+            scopes = resources.setdefault(id(span.resource), (span.resource, {}))[1]
+            scope = span.instrumentation_scope
+            scopes.setdefault((scope.name, scope.version), []).append(otlp_span(span))
+
+        request = {'resourceSpans': [
+            {'resource': {'attributes': otlp_attributes(resource.attributes)},
+             'scopeSpans': [{'scope': dict(name=name, version=version) if version else {'name': name},
+                             'spans': scope_spans} for (name, version), scope_spans in scopes.items()]}
+            for resource, scopes in resources.values()]}
+        line = (json.dumps(request, separators=(',', ':')) + '\n').encode('utf-8')
+
+        try:
+            with self.lock:
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except (IOError, OSError):
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis=30000):
+        return True
+
+    def shutdown(self):
+        pass
+
+
+class Tracer(object):
+    """
+    Spans of a module run or inventory parse, written to an OTLP/JSON file.
+
+    Tracing is enabled by a file path and requires the opentelemetry-sdk package, which is only imported
+    then.  Otherwise every method is a no-op and span() yields None.  Spans opened without a current span,
+    in the main thread or in a worker thread, are children of the root span.  A W3C TRACEPARENT in the
+    environment makes the root span part of the caller's trace.
+    """
+
+    def __init__(self, path=None, attributes=None):
+        self.provider = None
+        self.tracer = None
+        self.root = None
+
+        if not path:
+            return
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError:
+            return
+
+        resource = Resource.create(dict({'service.name': 'ansible'}, **(attributes or {})))
+        self.provider = TracerProvider(resource=resource)
+        self.provider.add_span_processor(BatchSpanProcessor(OtlpJsonFileExporter(path)))
+        self.tracer = self.provider.get_tracer('wwt.ansible_dnac')
+
+    @property
+    def enabled(self):
+        return self.tracer is not None
+
+    def start(self, name, attributes=None):
+        """
+        Open the root span, ended by finish().
+        """
+        if self.tracer is None:
+            return
+        context = None
+        if os.environ.get('TRACEPARENT'):
+            from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+            context = TraceContextTextMapPropagator().extract({'traceparent': os.environ['TRACEPARENT']})
+        self.root = self.tracer.start_span(name, context=context, attributes=attributes)
+
+    @contextmanager
+    def span(self, name, attributes=None, client=False):
+        """
+        Open a span around a phase.
+
+        :param client: The span covers a request to the controller.
+        :return: the span, None when tracing is disabled.
+        """
+        if self.tracer is None:
+            yield None
+            return
+
+        from opentelemetry import trace
+
+        context = None
+        if self.root is not None and not trace.get_current_span().get_span_context().is_valid:
+            context = trace.set_span_in_context(self.root)
+        kind = trace.SpanKind.CLIENT if client else trace.SpanKind.INTERNAL
+        with self.tracer.start_as_current_span(name, context=context, kind=kind, attributes=attributes) as span:
+            yield span
+
+    def finish(self, error=None, attributes=None):
+        """
+        End the root span and write the pending spans.
+
+        :param error: Failure message, marks the root span as failed.
+        """
+        if self.tracer is None:
+            return
+        if self.root is not None:
+            from opentelemetry.trace import Status, StatusCode
+
+            self.root.set_attributes(attributes or {})
+            if error:
+                self.root.set_status(Status(StatusCode.ERROR, str(error)))
+            self.root.end()
+            self.root = None
+        self.provider.shutdown()
+        self.tracer = None
@@ -42,7 +42,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # instantiate dnac object
@@ -74,13 +74,10 @@ def main():
         _credential_val_type = 'credential_snmp_v2_write'
 
     # lookup group id
-    dnac.api_path = 'api/v1/group'
-    groups = dnac.get_obj()['response']
-    _group_id = [g['id'] for g in groups
-                 if g['name'] == module.params['group_name']]
-
-    if len(_group_id) == 1:
-        _group_id = _group_id[0]
+    _group = dnac.get_site(module.params['group_name'])
+    if _group is None:
+        module.fail_json(msg='Unable to find group with the supplied information.')
+    _group_id = _group['id']
 
     if len(_cred_id) == 1:
         _cred_id = _cred_id[0]
@@ -107,6 +104,9 @@ def main():
                 ]
         }
     ]
+    current = dnac.get_common_settings(_group_id).get(_credential_key)
+    dnac.set_diff({_credential_key: current['value'] if current else []}, {_credential_key: payload[0]['value']})
+
     dnac.api_path = 'api/v1/commonsetting/global/' + _group_id
     dnac.create_obj(payload)
 
@@ -23,11 +23,15 @@ description:
 - Create a banner in Cisco DNA Center at any valid level in the hierarchy.
 version_added: "2.5"
 author: "Jeff Andiorio (@jandiorio)"
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
     - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+    - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
   port:
       description:
           - Port is the TCP port for the HTTP connection.
@@ -40,12 +44,14 @@ options:
       description:
           - Provide the username for the connection to the
             Cisco DNA Center Controller.
-      required: true
+          - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+      required: false
   password:
       description:
           - Provide the password for connection to the
             Cisco DNA Center Controller.
-      required: true
+          - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+      required: false
   use_proxy:
       description:
           - Enter a boolean value for whether to use proxy or not.
@@ -24,11 +24,15 @@ description:
 version_added: "2.5"
 author: "Jeff Andiorio (@jandiorio)"
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
     version_added: "2.5"
   port:
     description:
@@ -42,12 +46,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
     version_added: "2.5"
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
     version_added: "2.5"
   use_proxy:
     description:
@@ -184,7 +190,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     #  Build the payload dictionary
@@ -220,13 +226,15 @@ def main():
         if setting['username'] == payload[0]['username']:
             if module.params['state'] == 'absent':
                 dnac.api_path = 'api/v1/global-credential'
+                dnac.set_diff(setting, {})
                 dnac.delete_obj(setting['id'])
             elif module.params['state'] == 'update':
                 # call update function
-                payload = payload[0].update({'id': setting['id']})
+                payload[0].update({'id': setting['id']})
                 dnac.api_path = 'api/v1/global-credential/cli'
                 # dnac.api_path = 'dna/intent/api/v1/global-credential/cli'
-                dnac.update_obj(payload)
+                dnac.set_diff(setting, payload[0])
+                dnac.update_obj(payload[0])
 
     if not _user_exists and module.params['state'] == 'present':
         # call create function
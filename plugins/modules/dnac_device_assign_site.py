@@ -21,11 +21,15 @@ description:
 version_added: "2.5"
 author: "Jeff Andiorio (@jandiorio)"
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -39,12 +43,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -110,6 +116,8 @@ options:
 
 notes:
     - Either device_name or device_mgmt_ip is required, but not both.
+    - With I(state=update) a device assigned to another group is first removed from it.  The module always
+      waits for the removal, I(wait) only applies to the assignment to the new group.
 
 '''
 
@@ -192,18 +200,10 @@ def main():
         module.fail_json(msg='Unable to find device with supplied information.')
 
     # get the group id
-    if module.params['group_name'] is not None:
-        dnac.api_path = 'api/v1/group?groupName=' + module.params['group_name']
-    elif module.params['group_name_hierarchy'] is not None:
-        dnac.api_path = 'api/v1/group?groupNameHierarchy=' + module.params['group_name_hierarchy']
-
-    # dnac.api_path = 'api/v1/group?groupName=' + module.params['group_name']
-    group_results = dnac.get_obj()
-
-    try:
-        group_id = group_results['response'][0]['id']
-    except IndexError:
+    group = dnac.get_site(name=module.params['group_name'], hierarchy=module.params['group_name_hierarchy'])
+    if group is None:
         module.fail_json(msg='Unable to find group with the supplied information.')
+    group_id = group['id']
 
     #  check if the device is already a member of that group
     # 1.2 ???  dnac.api_path = 'api/v1/member/group?groupType=SITE&id=' + device_id
@@ -241,7 +241,8 @@ def main():
         elif group_assignment['response'][device_id][0]['id'] != group_id:
             _current_group_id = group_assignment['response'][device_id][0]['id']
             dnac.api_path = 'api/v1/group/' + _current_group_id + '/member'
-            dnac.delete_obj(device_id)
+            # the new assignment needs the removal to have completed
+            dnac.delete_obj(device_id, wait=True)
 
             # change the API to the new group
             dnac.api_path = 'api/v1/group/' + group_id + '/member'
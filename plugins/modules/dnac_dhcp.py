@@ -21,11 +21,15 @@ description: Add or delete DHCP Server(s) in the Cisco DNA Center Design Workflo
 version_added: "2.5"
 author: "Jeff Andiorio (@jandiorio)"
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -39,12 +43,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
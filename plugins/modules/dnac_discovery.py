@@ -22,11 +22,15 @@ version_added: "2.5"
 author:
   - Jeff Andiorio (@jandiorio)
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -40,12 +44,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -209,7 +215,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # Instantiate the DnaCenter class object
@@ -323,7 +329,8 @@ def main():
     # does discovery provided exist
     if module.params['discovery_name'] in _discovery_names:
         _discovery_exists = True
-        _discovery_id = [d['id'] for d in discoveries['response'] if d['name'] == module.params['discovery_name']][0]
+        _discovery = [d for d in discoveries['response'] if d['name'] == module.params['discovery_name']][0]
+        _discovery_id = _discovery['id']
     else:
         _discovery_exists = False
 
@@ -332,6 +339,7 @@ def main():
         result['changed'] = True
         dnac.api_path = 'api/v1/discovery'
         payload.update({'id': _discovery_id})
+        dnac.set_diff(_discovery, payload)
         dnac.update_obj(payload)
         module.exit_json(msg='Discovery already exists.', **result)
     elif module.params['state'] == 'present' and _discovery_exists:
@@ -341,9 +349,8 @@ def main():
         dnac.create_obj(payload)
 
     elif module.params['state'] == 'absent' and _discovery_exists:
-        _discovery_id = [discovery['id'] for discovery in discoveries['response']
-                         if discovery['name'] == module.params['discovery_name']]
-        dnac.delete_obj(_discovery_id[0])
+        dnac.set_diff(_discovery, {})
+        dnac.delete_obj(_discovery_id)
 
     elif module.params['state'] == 'absent' and not _discovery_exists:
         result['changed'] = False
@@ -19,11 +19,15 @@ version_added: '2.4'
 requirements:
   - DNA Center 1.1+
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -37,12 +41,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -166,7 +172,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # build the required payload data structure
@@ -200,11 +206,13 @@ def main():
         result['changed'] = False
         module.exit_json(msg='IP Pool already exists.', **result)
     elif module.params['state'] == 'present' and not _ip_pool_exists:
+        dnac.set_diff({}, payload)
         dnac.create_obj(payload)
     elif module.params['state'] == 'absent' and _ip_pool_exists:
-        _ip_pool_id = [pool['id'] for pool in ip_pools['response']
-                       if pool['ipPoolName'] == module.params['ip_pool_name']]
-        dnac.delete_obj(_ip_pool_id[0])
+        _ip_pool = [pool for pool in ip_pools['response']
+                    if pool['ipPoolName'] == module.params['ip_pool_name']]
+        dnac.set_diff(_ip_pool[0], {})
+        dnac.delete_obj(_ip_pool[0]['id'])
     elif module.params['state'] == 'absent' and not _ip_pool_exists:
         result['changed'] = False
         module.exit_json(msg='Ip pool Does not exist.  Cannot delete.', **result)
@@ -23,11 +23,15 @@ version_added: 'x.x'
 requirements:
 - DNA Center 1.1+
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
     - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+    - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
       description:
@@ -41,12 +45,14 @@ options:
   username:
       description:
           - Provide the username for the connection to the Cisco DNA Center Controller.
-      required: true
+          - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+      required: false
 
   password:
       description:
           - Provide the password for connection to the Cisco DNA Center Controller.
-      required: true
+          - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+      required: false
 
   use_proxy:
       description:
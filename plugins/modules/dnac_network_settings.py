@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = r'''
+---
+module: dnac_network_settings
+short_description: Manage the network settings of many sites in Cisco DNA Center
+description:
+  - Manage NTP, DNS, DHCP, Syslog, SNMP, Netflow, banner and timezone settings of many sites in one task.
+  - The current settings of all sites are read concurrently, one request per site.  The changed settings
+    of a site are sent in a single common setting request and the resulting tasks awaited concurrently.
+version_added: "2.9"
+author:
+  - Jeff Andiorio (@jandiorio)
+
+requirements:
+  - requests
+
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
+options:
+  host:
+    description:
+      - Host is the target Cisco DNA Center controller to execute against.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  username:
+    description:
+      - Provide the username for the connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  password:
+    description:
+      - Provide the password for connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  state:
+    description:
+      - With C(absent) the given settings are cleared, their values are ignored.
+    required: false
+    default: present
+    choices:
+      - present
+      - absent
+
+  settings:
+    description:
+      - Settings by site.  The site is the name of a group, its full hierarchy or C(Global).
+      - Each site takes any of the keys C(ntp) (list of servers), C(dns) (dictionary of I(domain_name),
+        I(primary_dns_server) and I(secondary_dns_server)), C(dhcp) (list of servers), C(syslog) and
+        C(snmp) (list of servers or dictionary of I(servers) and I(enable_dnac)), C(netflow)
+        (dictionary of I(collector) and I(port)), C(banner) (message or dictionary of I(message) and
+        I(retain_banner)) and C(timezone) (timezone name).
+    required: true
+    type: dict
+
+  workers:
+    description:
+      - Maximum number of requests sent or tasks polled at the same time.
+    required: false
+    type: int
+    default: 10
+'''
+
+EXAMPLES = r'''
+- name: apply the network settings of all sites
+  dnac_network_settings:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    settings:
+      Global:
+        ntp: [192.168.200.1, 192.168.200.2]
+        dns:
+          domain_name: wwtatc.local
+          primary_dns_server: 192.168.200.10
+        syslog: [192.168.200.3]
+        banner: Authorized access only
+      Global/USA/St Louis:
+        dhcp: [192.168.201.1]
+        netflow:
+          collector: 192.168.201.5
+          port: 2055
+        timezone: America/Chicago
+'''
+
+RETURN = r'''
+changes:
+  description: Setting keys changed by site.
+  returned: always
+  type: dict
+  sample:
+    Global/USA/St Louis:
+      - dhcp.server
+      - timezone.site
+previous:
+  description: Current value of every setting key managed by site.
+  returned: always
+  type: dict
+tasks:
+  description: Final state of the common setting tasks, see the dnac_task_wait module.
+  returned: when settings were changed
+  type: list
+task_ids:
+  description: Common setting tasks submitted with I(wait=false).
+  returned: when I(wait=false)
+  type: list
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.six import string_types
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.dnac import (
+    SETTING_PATH, DnaCenter, dnac_argument_spec)
+
+
+def servers(value):
+    if isinstance(value, list):
+        return value, True
+    return value.get('servers', []), value.get('enable_dnac', True)
+
+
+def ntp_setting(value):
+    return {"instanceType": "ip", "type": "ip.address", "key": "ntp.server", "value": value}
+
+
+def dns_setting(value):
+    return {"instanceType": "dns", "type": "dns.setting", "key": "dns.server",
+            "value": [{"domainName": value.get('domain_name', ''),
+                       "primaryIpAddress": value.get('primary_dns_server', ''),
+                       "secondaryIpAddress": value.get('secondary_dns_server')}]}
+
+
+def dhcp_setting(value):
+    return {"instanceType": "ip", "type": "ip.address", "key": "dhcp.server", "value": value}
+
+
+def syslog_setting(value):
+    ip_addresses, enable_dnac = servers(value)
+    return {"instanceType": "syslog", "type": "syslog.setting", "key": "syslog.server",
+            "value": [{"ipAddresses": ip_addresses, "configureDnacIP": enable_dnac}]}
+
+
+def snmp_setting(value):
+    ip_addresses, enable_dnac = servers(value)
+    return {"instanceType": "snmp", "type": "snmp.setting", "key": "snmp.trap.receiver",
+            "value": [{"ipAddresses": ip_addresses, "configureDnacIP": enable_dnac}]}
+
+
+def netflow_setting(value):
+    return {"instanceType": "netflow", "type": "netflow.setting", "key": "netflow.collector",
+            "value": [{"ipAddress": value.get('collector'), "port": value.get('port')}]}
+
+
+def banner_setting(value):
+    if isinstance(value, string_types):
+        value = {'message': value}
+    return {"instanceType": "banner", "type": "banner.setting", "key": "device.banner",
+            "value": [{"bannerMessage": value.get('message', ''),
+                       "retainExistingBanner": value.get('retain_banner', True)}]}
+
+
+def timezone_setting(value):
+    return {"instanceType": "timezone", "instanceUuid": "", "type": "timezone.setting", "key": "timezone.site",
+            "value": [value]}
+
+
+SETTINGS = {
+    'ntp': ntp_setting,
+    'dns': dns_setting,
+    'dhcp': dhcp_setting,
+    'syslog': syslog_setting,
+    'snmp': snmp_setting,
+    'netflow': netflow_setting,
+    'banner': banner_setting,
+    'timezone': timezone_setting,
+}
+
+# the sites are free form keys of settings, so the values are checked here rather than with suboptions
+SETTING_TYPES = {
+    'ntp': ((list,), 'a list of servers'),
+    'dns': ((dict,), 'a dictionary'),
+    'dhcp': ((list,), 'a list of servers'),
+    'syslog': ((list, dict), 'a list of servers or a dictionary'),
+    'snmp': ((list, dict), 'a list of servers or a dictionary'),
+    'netflow': ((dict,), 'a dictionary'),
+    'banner': (string_types + (dict,), 'a message or a dictionary'),
+    'timezone': (string_types, 'a timezone name'),
+}
+
+
+def check_settings(dnac, site, keys):
+    """
+    Fail on a site which is not a dictionary of supported setting keys or on a value of the wrong type.
+    """
+    if not isinstance(keys, dict):
+        dnac.module.fail_json(msg='The settings of {0} must be a dictionary of setting keys.'.format(site))
+
+    unknown = set(keys) - set(SETTINGS)
+    if unknown:
+        dnac.module.fail_json(msg='Unsupported settings for {0}: {1}.  Expected any of {2}.'.format(
+            site, ', '.join(sorted(unknown)), ', '.join(sorted(SETTINGS))))
+
+    for name, value in sorted(keys.items()):
+        types, expected = SETTING_TYPES[name]
+        if not isinstance(value, types):
+            dnac.module.fail_json(msg='Invalid {0} setting for {1}: expected {2}, got {3}.'.format(
+                name, site, expected, type(value).__name__))
+
+
+def desired_settings(dnac, settings, absent, workers):
+    """
+    Resolve the sites and build the common setting items of every site.
+
+    :return: dictionary of site to (group id, list of setting items).
+    """
+    for site, keys in settings.items():
+        check_settings(dnac, site, keys or {})
+
+    dnac.find_sites(names=[site for site in settings if site.lower() not in ['-1', 'global']],
+                    workers=workers)
+
+    desired = {}
+    for site, keys in settings.items():
+        group_id = dnac.get_group_id(site)
+        if group_id is None:
+            dnac.module.fail_json(msg='Unable to locate group provided: {0}'.format(site))
+
+        items = []
+        for name, value in sorted((keys or {}).items()):
+            item = SETTINGS[name](value)
+            item.update({"namespace": "global", "groupUuid": group_id})
+            if absent:
+                item['value'] = []
+            items.append(item)
+        desired[site] = (group_id, items)
+    return desired
+
+
+def current_settings(dnac, desired, workers):
+    """
+    Read all setting keys of every site with one GET per site, the sites concurrently.
+
+    :return: dictionary of (site, key) to the current value or None when not set.
+    """
+    snapshots = dnac.load_common_settings([group_id for group_id, items in desired.values()], workers)
+
+    current = {}
+    for site, (group_id, items) in desired.items():
+        for item in items:
+            setting = snapshots[group_id].get(item['key'])
+            current[(site, item['key'])] = setting['value'] if setting else None
+    return current
+
+
+def submit(dnac, changes, workers):
+    """
+    Send the changed items of each site in one common setting request, the sites in parallel.
+
+    :param changes: list of (site, group id, items) tuples.
+
+    :return: list of task IDs in the order of changes.
+    """
+    def send(change):
+        site, group_id, items = change
+        response = dnac.request('POST', SETTING_PATH + group_id, json=items)
+        if response.status_code not in [200, 201, 202]:
+            return None, '{0}: {1}'.format(site, response.text)
+        return response.json()['response']['taskId'], None
+
+    dnac.invalidate_common_settings()
+    with dnac.tracer.span('dnac.submit', {'dnac.endpoint': 'POST ' + SETTING_PATH + '{id}',
+                                          'dnac.calls': len(changes)}) as span:
+        with ThreadPoolExecutor(max_workers=min(workers, len(changes))) as executor:
+            results = list(executor.map(send, changes))
+        if span is not None:
+            span.set_attribute('dnac.task_ids', [task_id for task_id, error in results if task_id])
+
+    errors = [error for task_id, error in results if error is not None]
+    if errors:
+        dnac.result['changed'] = len(errors) < len(changes)
+        dnac.result['original_message'] = errors
+        dnac.module.fail_json(msg='Failed to update the settings of {0} of {1} sites.'.format(
+            len(errors), len(changes)), **dnac.result)
+    return [task_id for task_id, error in results]
+
+
+def main():
+    module_args = dnac_argument_spec
+    module_args.update(
+        state=dict(type='str', default='present', choices=['absent', 'present']),
+        settings=dict(type='dict', required=True),
+        workers=dict(type='int', required=False, default=10)
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    # Instantiate the DnaCenter class object
+    dnac = DnaCenter(module)
+    workers = module.params['workers']
+
+    desired = desired_settings(dnac, module.params['settings'], module.params['state'] == 'absent', workers)
+    current = current_settings(dnac, desired, workers)
+
+    # keep the items whose value differs from the controller
+    changes = []
+    dnac.result['changes'] = {}
+    dnac.result['previous'] = {}
+    with dnac.tracer.span('dnac.diff', {'dnac.sites': len(desired)}):
+        for site, (group_id, items) in desired.items():
+            dnac.result['previous'][site] = dict((item['key'], current[(site, item['key'])]) for item in items)
+            changed = [item for item in items if item['value'] != (current[(site, item['key'])] or [])]
+            if changed:
+                changes.append((site, group_id, changed))
+                dnac.result['changes'][site] = [item['key'] for item in changed]
+
+    dnac.set_diff(dnac.result['previous'],
+                  dict((site, dict((item['key'], item['value']) for item in items))
+                       for site, (group_id, items) in desired.items()))
+
+    if not changes:
+        module.exit_json(msg='Already in desired state.', **dnac.result)
+    dnac.result['changed'] = True
+    if module.check_mode:
+        module.exit_json(msg='In check_mode.  Changes would be required.', **dnac.result)
+
+    task_ids = submit(dnac, changes, workers)
+    if not module.params['wait']:
+        dnac.result['task_ids'] = task_ids
+        module.exit_json(msg='Task submitted.', **dnac.result)
+
+    tasks = dnac.wait_for_tasks(task_ids=task_ids, workers=workers)
+    dnac.result['tasks'] = tasks
+    failed = [site for (site, group_id, items), task in zip(changes, tasks) if task['failed']]
+    if failed:
+        module.fail_json(msg='Failed to update the settings of {0}.'.format(', '.join(failed)), **dnac.result)
+
+    module.exit_json(msg='Settings of {0} sites updated.'.format(len(changes)), **dnac.result)
+
+
+if __name__ == "__main__":
+    main()
@@ -22,11 +22,15 @@ author:
 requirements:
   - requests
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -40,12 +44,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -106,7 +112,7 @@ options:
 
   parent_name:
     description:
-      - name of the containing site
+      - name of the containing site or its full hierarchy such as C(Global/USA/St Louis)
     required: true
     default: Global
 
@@ -116,12 +122,15 @@ options:
     required: false
 
   latitude:
-    description: latitude of the building
+    description:
+      - latitude of the building
+      - resolved from I(address) with the configured I(geocoder) when omitted
     required: false
 
   longitude:
     description:
       - longitude of the building
+      - resolved from I(address) with the configured I(geocoder) when omitted
     required: false
 
   rf_model:
@@ -177,6 +186,18 @@ EXAMPLES = r'''
       latitude: 38.540450
       longitude: -90.443660
 
+  - name: create buildings resolving the coordinates from a local gazetteer
+    dnac_site:
+      host: "{{ inventory_hostname }}"
+      username: "{{ username }}"
+      password: "{{ password }}"
+      name: Building-2
+      site_type: building
+      parent_name: Site-a
+      address: 1 World Wide Way, St Louis, Mo
+      geocoder: gazetteer
+      gazetteer: files/sites.csv
+
   - name: create floors
     dnac_site:
       host: "{{ inventory_hostname }}"
@@ -207,9 +228,6 @@ __metaclass__ = type
 
 
 def main():
-    _site_exists = False
-    _parent_exists = False
-
     module_args = dnac_argument_spec
     module_args.update(
         state=dict(type='str', default='present', choices=['absent', 'present', 'update']),
@@ -235,40 +253,31 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # Instantiate the DnaCenter class object
     dnac = DnaCenter(module)
-    dnac.api_path = 'api/v1/group'
-
-    #  Get the sites
-    sites = dnac.get_obj()
-    try:
-        _site_names = [site['name'] for site in sites['response']]
-    except TypeError:
-        module.fail_json(msg=sites)
-
-    # does site provided exist
-    if module.params['name'] in _site_names:
-        _site_exists = True
-    else:
-        _site_exists = False
-
-    # does parent provided exist
-    if module.params['parent_name'] in _site_names or module.params['parent_name'] == 'Global':
-        _parent_exists = True
-    else:
-        _parent_exists = False
-        module.fail_json(msg='Parent Site does not exist...')
 
     # Obtain Parent groupNameHierarchy
     if module.params['parent_name'] == "Global":
         parent_hierarchy = "Global"
     else:
-        parent_hierarchy = [site['groupNameHierarchy']
-                            for site in sites['response']
-                            if site['name'] == module.params['parent_name']][0]
+        parent = dnac.get_site(module.params['parent_name'])
+        if parent is None:
+            module.fail_json(msg='Parent Site does not exist...')
+        parent_hierarchy = parent['groupNameHierarchy']
+
+    # does site provided exist
+    site = dnac.get_site(hierarchy=parent_hierarchy + '/' + module.params['name'])
+    _site_exists = site is not None
+
+    # resolve building coordinates with the configured geocoder when not provided
+    if module.params['site_type'] == 'building' and module.params['address'] and \
+            not (module.params['latitude'] and module.params['longitude']):
+        location = dnac.parse_geo(module.params['address'])
+        module.params['latitude'] = location['latitude']
+        module.params['longitude'] = location['longitude']
 
     # build the required payload data structure
     if module.params['site_type'] == 'area':
@@ -317,10 +326,11 @@ def main():
         result['intended_payload'] = payload
         module.exit_json(msg='Site already exists.', **result)
     elif module.params['state'] == 'present' and not _site_exists:
+        dnac.set_diff({}, payload)
         dnac.create_obj(payload)
     elif module.params['state'] == 'absent' and _site_exists:
-        _site_id = [site['id'] for site in sites['response'] if site['name'] == module.params['name']]
-        dnac.delete_obj(_site_id[0])
+        dnac.set_diff(site, {})
+        dnac.delete_obj(site['id'])
     elif module.params['state'] == 'absent' and not _site_exists:
         result['changed'] = False
         module.exit_json(msg='Site Does not exist.  Cannot delete.', **result)
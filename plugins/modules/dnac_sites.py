@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = r'''
+---
+module: dnac_sites
+short_description: Add or Delete a hierarchy of sites in DNA Center
+description:
+  - Add or delete many areas, buildings and floors in the network hierarchy in one task.
+  - The requested sites and their parents are looked up with concurrent, server side filtered queries
+    and compared with the existing hierarchy.  Missing sites are created one tree level at a time,
+    the sites of a level are submitted in parallel and their executions awaited concurrently.
+  - With I(state=absent) the deepest sites are deleted first.
+version_added: "2.9"
+author:
+  - Jeff Andiorio (@jandiorio)
+
+requirements:
+  - requests
+
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
+options:
+  host:
+    description:
+      - Host is the target Cisco DNA Center controller to execute against.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  username:
+    description:
+      - Provide the username for the connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  password:
+    description:
+      - Provide the password for connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  timeout:
+    description:
+      - Seconds to wait for each site execution to complete.
+    required: false
+    type: int
+    default: 30
+
+  state:
+    description:
+      - State provides the action to be executed using the terms present, absent, etc.
+    required: false
+    default: present
+    choices:
+      - present
+      - absent
+
+  sites:
+    description:
+      - Sites to manage, in any order.  Each item takes the I(name), I(site_type), I(parent_name),
+        I(address), I(latitude), I(longitude), I(rf_model), I(width), I(length) and I(height) options of
+        the dnac_site module.
+      - I(parent_name) is either the name of a site, the name of another item of I(sites) or a full
+        hierarchy such as C(Global/USA/St Louis).
+    required: true
+    type: list
+    elements: dict
+
+  workers:
+    description:
+      - Maximum number of sites looked up, submitted or polled at the same time.
+    required: false
+    type: int
+    default: 10
+
+  wait:
+    description:
+      - Parents must exist before their children are created, so every level but the last is always
+        awaited.  With C(false) the executions of the last level are returned as I(execution_ids)
+        without waiting for them.
+    required: false
+    type: bool
+    default: true
+'''
+
+EXAMPLES = r'''
+- name: create the campus hierarchy
+  dnac_sites:
+    host: "{{ inventory_hostname }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    workers: 20
+    sites:
+      - name: USA
+        site_type: area
+      - name: St Louis
+        site_type: area
+        parent_name: USA
+      - name: Building-1
+        site_type: building
+        parent_name: St Louis
+        address: 1 World Wide Way, St Louis, Mo
+        latitude: 38.540450
+        longitude: -90.443660
+      - name: Floor-1
+        site_type: floor
+        parent_name: Global/USA/St Louis/Building-1
+        rf_model: 'Cubes And Walled Offices'
+        height: 10
+        width: 100
+        length: 200
+'''
+
+RETURN = r'''
+sites:
+  description: Hierarchy of the sites created or deleted, in submission order.
+  returned: always
+  type: list
+  sample:
+    - Global/USA
+    - Global/USA/St Louis
+tasks:
+  description: Final state of every site execution, see the dnac_task_wait module.
+  returned: when sites were submitted
+  type: list
+execution_ids:
+  description: Executions of the last level submitted with I(wait=false).
+  returned: when I(wait=false)
+  type: list
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.dnac import DnaCenter, dnac_argument_spec
+
+SITE_PATH = 'dna/intent/api/v1/site'
+
+
+def global_hierarchy(parent):
+    """
+    :return: whether parent is Global or a hierarchy below it rather than a site name.
+    """
+    return parent == 'Global' or parent.startswith('Global/')
+
+
+def existing_parent(dnac, parent):
+    """
+    :return: groupNameHierarchy of an existing parent given by name or hierarchy.
+    """
+    if global_hierarchy(parent):
+        return parent
+    site = dnac.get_site(parent)
+    if site is None:
+        dnac.module.fail_json(msg='Parent Site does not exist: {0}'.format(parent))
+    return site['groupNameHierarchy']
+
+
+def site_hierarchies(dnac, sites):
+    """
+    Resolve the groupNameHierarchy of every requested site.
+
+    :param sites: Requested sites.
+
+    :return: list of hierarchies in the order of sites.
+    """
+    module = dnac.module
+    requested = {}
+    for site in sites:
+        requested.setdefault(site['name'], []).append(site)
+
+    resolved = {}
+
+    def hierarchy(site, seen):
+        key = id(site)
+        if key in resolved:
+            return resolved[key]
+        if key in seen:
+            module.fail_json(msg='Site hierarchy contains a loop: {0}'.format(site['name']))
+        seen.add(key)
+
+        parent = site['parent_name']
+        if parent in requested and not global_hierarchy(parent):
+            if len(requested[parent]) > 1:
+                module.fail_json(msg='Parent site {0} is ambiguous, use its full hierarchy.'.format(parent))
+            parent_hierarchy = hierarchy(requested[parent][0], seen)
+        else:
+            parent_hierarchy = existing_parent(dnac, parent)
+
+        resolved[key] = parent_hierarchy + '/' + site['name']
+        return resolved[key]
+
+    return [hierarchy(site, set()) for site in sites]
+
+
+def site_payload(dnac, site, parent_hierarchy):
+    """
+    Build the intent API payload of a site.
+    """
+    if site['site_type'] == 'area':
+        return {
+            "type": "area",
+            "site": {
+                "area": {
+                    "name": site['name'],
+                    "parentName": parent_hierarchy
+                }
+            }
+        }
+    elif site['site_type'] == 'building':
+        if site['address'] and not (site['latitude'] and site['longitude']):
+            location = dnac.parse_geo(site['address'])
+            site['latitude'] = location['latitude']
+            site['longitude'] = location['longitude']
+        return {
+            "type": "building",
+            "site": {
+                "building": {
+                    "name": site['name'],
+                    "address": site['address'],
+                    "parentName": parent_hierarchy,
+                    "latitude": site['latitude'],
+                    "longitude": site['longitude']
+                }
+            }
+        }
+    return {
+        "type": "floor",
+        "site": {
+            "floor": {
+                "name": site['name'],
+                "parentName": parent_hierarchy,
+                "rfModel": site['rf_model'],
+                "width": site['width'],
+                "length": site['length'],
+                "height": site['height']
+            }
+        }
+    }
+
+
+def pending_levels(sites, hierarchies, existing, absent):
+    """
+    Group the sites that need a change by tree level.
+
+    :param existing: SiteIndex of the controller.
+    :param absent: Sites are to be deleted.
+
+    :return: dictionary of depth to an ordered dictionary of hierarchy to site.
+    """
+    levels = {}
+    for site, hierarchy in zip(sites, hierarchies):
+        if (existing.by_hierarchy(hierarchy) is not None) == absent:
+            levels.setdefault(hierarchy.count('/'), {})[hierarchy] = site
+    return levels
+
+
+def submit(dnac, calls, workers):
+    """
+    Send the site requests of one level in parallel.
+
+    :param calls: list of (method, path, payload) tuples.
+
+    :return: list of execution IDs in the order of calls.
+    """
+    def send(call):
+        method, path, payload = call
+        response = dnac.request(method, path, json=payload)
+        if response.status_code not in [200, 201, 202]:
+            return None, response.text
+        return response.json()['executionId'], None
+
+    with dnac.tracer.span('dnac.submit', {'dnac.endpoint': calls[0][0] + ' ' + SITE_PATH,
+                                          'dnac.calls': len(calls)}) as span:
+        with ThreadPoolExecutor(max_workers=min(workers, len(calls))) as executor:
+            results = list(executor.map(send, calls))
+        if span is not None:
+            span.set_attribute('dnac.execution_ids', [execution_id for execution_id, error in results if execution_id])
+
+    errors = [error for execution_id, error in results if error is not None]
+    if errors:
+        dnac.result['changed'] = True
+        dnac.result['original_message'] = errors
+        dnac.module.fail_json(msg='Failed to submit {0} of {1} sites.'.format(len(errors), len(calls)),
+                              **dnac.result)
+    return [execution_id for execution_id, error in results]
+
+
+def main():
+    module_args = dnac_argument_spec
+    module_args.update(
+        state=dict(type='str', default='present', choices=['absent', 'present']),
+        sites=dict(type='list', required=True, elements='dict', options=dict(
+            name=dict(type='str', required=True),
+            site_type=dict(type='str', default='area', choices=['area', 'building', 'floor']),
+            parent_name=dict(type='str', default='Global'),
+            address=dict(type='str'),
+            latitude=dict(type='str', required=False),
+            longitude=dict(type='str', required=False),
+            rf_model=dict(type='str', choices=['Cubes And Walled Offices',
+                                               'Drywall Office Only',
+                                               'Indoor High Ceiling',
+                                               'Outdoor Open Space']),
+            width=dict(type='str', required=False),
+            length=dict(type='str', required=False),
+            height=dict(type='str', required=False),
+        )),
+        workers=dict(type='int', required=False, default=10)
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    # Instantiate the DnaCenter class object
+    dnac = DnaCenter(module)
+
+    # look up the existing parents and then the requested sites to diff the hierarchy against them
+    sites = module.params['sites']
+    requested = set(site['name'] for site in sites)
+    dnac.find_sites(names=[site['parent_name'] for site in sites
+                           if site['parent_name'] not in requested and not global_hierarchy(site['parent_name'])],
+                    workers=module.params['workers'])
+    hierarchies = site_hierarchies(dnac, sites)
+    existing = dnac.find_sites(hierarchies=hierarchies, workers=module.params['workers'])
+
+    # group the pending sites by tree level, parents are created first and deleted last
+    with dnac.tracer.span('dnac.diff', {'dnac.sites': len(sites)}):
+        levels = pending_levels(sites, hierarchies, existing, module.params['state'] == 'absent')
+    order = sorted(levels, reverse=module.params['state'] == 'absent')
+
+    dnac.result['sites'] = [hierarchy for depth in order for hierarchy in levels[depth]]
+    present = [hierarchy for hierarchy in hierarchies if existing.by_hierarchy(hierarchy) is not None]
+    dnac.set_diff({'sites': present}, {'sites': [] if module.params['state'] == 'absent' else hierarchies})
+    if not levels:
+        module.exit_json(msg='Sites already in the requested state.', **dnac.result)
+    dnac.result['changed'] = True
+    if module.check_mode:
+        module.exit_json(msg='In check_mode.  Changes would be required.', **dnac.result)
+
+    dnac.result['tasks'] = []
+    for count, depth in enumerate(order, 1):
+        if module.params['state'] == 'present':
+            calls = [('POST', SITE_PATH, site_payload(dnac, site, hierarchy.rsplit('/', 1)[0]))
+                     for hierarchy, site in levels[depth].items()]
+        else:
+            calls = [('DELETE', SITE_PATH + '/' + existing.by_hierarchy(hierarchy)['id'], None)
+                     for hierarchy in levels[depth]]
+        execution_ids = submit(dnac, calls, module.params['workers'])
+
+        if count == len(order) and not module.params['wait']:
+            dnac.result['execution_ids'] = execution_ids
+            module.exit_json(msg='Task submitted.', **dnac.result)
+
+        tasks = dnac.wait_for_tasks(execution_ids=execution_ids, workers=module.params['workers'])
+        dnac.result['tasks'].extend(tasks)
+        failed = [hierarchy for hierarchy, task in zip(levels[depth], tasks) if task['failed']]
+        if failed:
+            module.fail_json(msg='{0} of {1} sites failed: {2}'.format(len(failed), len(tasks), ', '.join(failed)),
+                             **dnac.result)
+
+    module.exit_json(msg='{0} sites completed successfully.'.format(len(dnac.result['sites'])), **dnac.result)
+
+
+if __name__ == "__main__":
+    main()
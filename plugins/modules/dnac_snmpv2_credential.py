@@ -21,11 +21,15 @@ version_added: '2.4'
 requirements:
   - DNA Center 1.2+
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
   port:
     description:
       - Port is the TCP port for the HTTP connection.
@@ -37,11 +41,13 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
   use_proxy:
     description:
       - Enter a boolean value for whether to use proxy or not.
@@ -138,7 +144,7 @@ def main():
             type='str', default='SNMPV2_WRITE_COMMUNITY',
             choices=['SNMPV2_READ_COMMUNITY', 'SNMPV2_WRITE_COMMUNITY']
         ),
-        snmp_community=dict(type='str', required=True),
+        snmp_community=dict(type='str', required=True, no_log=True),
         snmp_description=dict(type='str', required=True),
         snmp_comments=dict(type='str', required=True)
     )
@@ -150,7 +156,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
     if module.params['credential_type'] == 'SNMPV2_WRITE_COMMUNITY':
         _community_key_name = 'writeCommunity'
@@ -175,7 +181,7 @@ def main():
     settings = dnac.get_obj()
 
 #    _creds = [ cred['description'] for cred in settings['response']]
-    _creds = [(cred['description'], cred['id'])
+    _creds = [(cred['description'], cred['id'], cred)
               for cred in settings['response']
               if cred['description'] == module.params['snmp_description']]
 
@@ -203,6 +209,7 @@ def main():
 
         elif module.params['state'] == 'absent':
             dnac.api_path = 'api/v1/global-credential/'
+            dnac.set_diff(_creds[0][2], {})
             dnac.delete_obj(_creds[0][1])
 
     elif not _credential_exists:
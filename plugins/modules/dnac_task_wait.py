@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# Copyright (c) 2019 World Wide Technology, Inc.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = r'''
+---
+module: dnac_task_wait
+short_description: Wait for asynchronous DNA Center tasks to complete
+description:
+  - Wait concurrently for tasks submitted by other modules of this collection with C(wait=false).
+  - Fails when any of the tasks failed or did not complete within I(timeout).
+version_added: "2.9"
+author:
+  - Jeff Andiorio (@jandiorio)
+
+requirements:
+  - requests
+
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
+options:
+  host:
+    description:
+      - Host is the target Cisco DNA Center controller to execute against.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  username:
+    description:
+      - Provide the username for the connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  password:
+    description:
+      - Provide the password for connection to the Cisco DNA Center Controller.
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
+
+  timeout:
+    description:
+      - Seconds to wait for each task to complete.
+    required: false
+    default: 30
+
+  task_ids:
+    description:
+      - Task IDs returned as I(task_id) by the modules.
+    required: false
+    type: list
+
+  execution_ids:
+    description:
+      - Execution IDs returned as I(execution_id) by the modules using the intent API.
+    required: false
+    type: list
+
+  workers:
+    description:
+      - Maximum number of tasks polled at the same time.
+    required: false
+    type: int
+    default: 10
+'''
+
+EXAMPLES = r'''
+- name: change device roles without waiting
+  dnac_device_role:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    device_name: "{{ item }}"
+    device_role: ACCESS
+    wait: false
+  loop: "{{ access_switches }}"
+  register: role_changes
+
+- name: collect the results
+  dnac_task_wait:
+    host: "{{ host }}"
+    username: "{{ username }}"
+    password: "{{ password }}"
+    timeout: 300
+    task_ids: "{{ role_changes.results | selectattr('task_id', 'defined') | map(attribute='task_id') | list }}"
+'''
+
+RETURN = r'''
+tasks:
+  description:
+    - Final state of every task in the order given, task IDs first.
+    - Tasks whose status lookup was rejected or unreadable also carry the C(response) body.
+  returned: always
+  type: list
+  sample:
+    - id: 9e4b4f3c-52f4-4f19-a8d5-4d1c1b7d9f21
+      type: task
+      failed: false
+      msg: ''
+      status:
+        endTime: 1571234567890
+        isError: false
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.dnac import DnaCenter, dnac_argument_spec
+
+
+def main():
+    module_args = dnac_argument_spec
+    module_args.update(
+        task_ids=dict(type='list', required=False, default=[]),
+        execution_ids=dict(type='list', required=False, default=[]),
+        workers=dict(type='int', required=False, default=10)
+    )
+
+    result = dict(
+        changed=False,
+        original_message='',
+        message='')
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    # Instantiate the DnaCenter class object
+    dnac = DnaCenter(module)
+
+    tasks = dnac.wait_for_tasks(task_ids=module.params['task_ids'],
+                                execution_ids=module.params['execution_ids'],
+                                workers=module.params['workers'])
+    result['tasks'] = tasks
+
+    failed = [task['id'] for task in tasks if task['failed']]
+    if failed:
+        module.fail_json(msg='{0} of {1} tasks failed: {2}'.format(len(failed), len(tasks), ', '.join(failed)),
+                         **result)
+
+    module.exit_json(msg='{0} tasks completed successfully.'.format(len(tasks)), **result)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,11 +20,15 @@ author:
 requirements:
   - requests
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -38,12 +42,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -168,6 +174,8 @@ RETURN = r'''
 '''
 
 
+import copy
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.wwt.ansible_dnac.plugins.module_utils.network.dnac.dnac import DnaCenter, dnac_argument_spec
 
@@ -200,7 +208,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # build the required payload data structure
@@ -277,6 +285,7 @@ def main():
                 result['changed'] = False
                 module.exit_json(msg='Wireless Profile already exists.', **result)
             else:
+                dnac.set_diff(orig_config[0], proposed_config)
                 dnac.update_obj(proposed_config)
                 dnac.result['changed'] = True
                 module.exit_json(msg='Updated Wireless Profile.', **dnac.result)
@@ -292,9 +301,10 @@ def main():
     elif module.params['state'] == 'absent' and _profile_exists:
         # Create payload of existing profile
         payload = [profile for profile in profiles if profile['profileDetails']['name'] == module.params['name']]
+        dnac.set_diff(copy.deepcopy(payload[0]), {})
         # Remove Site Assignment
         payload[0]['profileDetails']['sites'] = []
-        dnac.update_obj(payload[0])
+        dnac.update_obj(payload[0], wait=True)
         # Delete the Wireless Profile
         dnac.delete_obj(module.params['name'])
 
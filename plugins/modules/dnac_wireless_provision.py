@@ -20,11 +20,15 @@ author:
 requirements:
   - requests
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -38,12 +42,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -184,7 +190,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # build the required payload data structure
@@ -234,7 +240,8 @@ def main():
     # actions
     if module.params['state'] == 'present' and _PROVISIONED:
         # module.exit_json(msg=payload)
-        dnac.update_obj(payload)
+        # the provisioned configuration of the controller cannot be read back to diff against
+        dnac.update_obj(payload, diff=False)
     elif module.params['state'] == 'present' and not _PROVISIONED:
         # module.exit_json(msg='provision')
         dnac.create_obj(payload)
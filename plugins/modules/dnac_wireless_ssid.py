@@ -20,11 +20,15 @@ author:
 requirements:
   - requests
 
+extends_documentation_fragment:
+  - wwt.ansible_dnac.dnac
+
 options:
   host:
     description:
       - Host is the target Cisco DNA Center controller to execute against.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   port:
     description:
@@ -38,12 +42,14 @@ options:
   username:
     description:
       - Provide the username for the connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   password:
     description:
       - Provide the password for connection to the Cisco DNA Center Controller.
-    required: true
+      - Required unless the task runs over the C(wwt.ansible_dnac.dnac) httpapi connection.
+    required: false
 
   use_proxy:
     description:
@@ -210,7 +216,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=module_args,
-        supports_check_mode=False
+        supports_check_mode=True
     )
 
     # build the required payload data structure
@@ -254,6 +260,7 @@ def main():
     elif module.params['state'] == 'absent' and _ssid_exists:
         # _ssid_id = [ssid['instanceUuid'] for ssid in ssids if ssid['ssidDetails'][0]['name'] == module.params['name']]
         # dnac.delete_obj(_ssid_id[0])
+        dnac.set_diff([ssid for ssid in ssids if ssid['ssidDetails'][0]['name'] == module.params['name']][0], {})
         dnac.delete_obj(module.params['name'])
     elif module.params['state'] == 'absent' and not _ssid_exists:
         result['changed'] = False